@@ -1,7 +1,11 @@
 import streamlit as st
 
+from metrics import set_page, start_exporter
+
 # Agrishield Branding
 st.set_page_config(page_title="Agrishield Insurance", page_icon="🌿", layout="wide")
+set_page("home")
+start_exporter()
 
 #st.image("agrishield_logo.png", width=150)  # Ensure the logo file is in your project folder
 st.title("🌾 Climate-Affected Farmers Insurance Portal")
@@ -43,8 +47,8 @@ st.markdown(
 # Initialize session state
 if "step" not in st.session_state:
     st.session_state.step = "registration"
-if "farmers_data" not in st.session_state:
-    st.session_state.farmers_data = []  # Ensuring it is always initialized
+if "farmer_id" not in st.session_state:
+    st.session_state.farmer_id = None  # Set by the registration page
 
 
 
@@ -56,7 +60,7 @@ if st.session_state.step == "registration":
         st.switch_page("pages/1_farmer_registration.py")
 
 elif st.session_state.step == "insurance_payout":
-    if not st.session_state.farmers_data:
+    if st.session_state.farmer_id is None:
         st.warning("⚠️ Kindly register first in order to get further details.")
     else:
         st.write("### View Your Insurance Payout Estimation")
@@ -65,7 +69,7 @@ elif st.session_state.step == "insurance_payout":
             st.switch_page("pages/2_insurance_payout.py")
 
 elif st.session_state.step == "premium_charges":
-    if not st.session_state.farmers_data:
+    if st.session_state.farmer_id is None:
         st.warning("⚠️ Kindly register first in order to get further details.")
     else:
         st.write("### Review Your Premium Charges")
@@ -0,0 +1,197 @@
+"""Time every page's compute path on synthetic registries.
+
+Usage (from the Agrishield_app folder):
+    python benchmarks/run_benchmarks.py --rows 1000 10000 100000 --output bench.json
+
+For each registry size a seeded synthetic CSV is written to a temporary
+folder, the app is pointed at it and each stage below is timed: data load
+(CSV parse and Arrow snapshot), registration writes (single, batched and
+through the background writer), pricing, dashboard filter and search,
+duplicate-email lookups, aggregation, figure construction, export, and
+finally pages 1-4 run headlessly through Streamlit's AppTest. Results are
+emitted as JSON (one record per size and stage) so runs can be compared
+release over release.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, APP_DIR)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import config  # noqa: E402
+import cube  # noqa: E402
+import data_store  # noqa: E402
+import export  # noqa: E402
+import identity_index  # noqa: E402
+import pricing  # noqa: E402
+import search_index  # noqa: E402
+import views  # noqa: E402
+from synthetic import generate_farmers, write_registry  # noqa: E402
+
+PAGES = [
+    "pages/1_farmer_registration.py",
+    "pages/2_insurance_payout.py",
+    "pages/3_premium_charges.py",
+    "pages/4_farmer_dashboard.py",
+]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return result, {"median_s": statistics.median(samples), "min_s": min(samples), "repeat": repeat}
+
+
+def build_search_index(farmers_df):
+    index = search_index.TrigramIndex()
+    index.update(farmers_df)
+    return index
+
+
+def build_dashboard_figures(farmers_df):
+    """The dashboard's three figures from server-side aggregates; returns their JSON size in bytes."""
+    import charts
+
+    pricing_df = pricing.price_frame(farmers_df)
+    figures = [
+        charts.province_pie(views.category_counts(farmers_df["Province"], "Province")),
+        charts.farm_size_histogram(views.histogram_bins(farmers_df["Farm Size"])),
+        charts.premium_payout_box({column: views.box_stats(pricing_df[column]) for column in ["Premium", "Payout"]}),
+    ]
+    return sum(len(figure.to_json()) for figure in figures)
+
+
+def run_page(page, farmer_id):
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(os.path.join(APP_DIR, page), default_timeout=600)
+    app.session_state["farmer_id"] = farmer_id
+    app.run()
+    if app.exception:
+        raise RuntimeError(f"{page} raised: {app.exception[0].value}")
+
+
+def bench_size(rows, seed, repeat, workdir, run_pages):
+    results = []
+
+    def record(stage, fn, times=repeat, **extra):
+        value, timing = timed(fn, times)
+        results.append({"rows": rows, "stage": stage, **timing, **extra})
+        return value
+
+    path = os.path.join(workdir, f"farmers_{rows}.csv")
+    record("generate_csv", lambda: write_registry(path, rows, seed=seed), times=1)
+    results[-1]["file_bytes"] = os.path.getsize(path)
+
+    snapshots, config.SNAPSHOTS = config.SNAPSHOTS, False  # time the CSV parse itself
+    farmers_df = record("load_csv_cold", lambda: data_store.CsvStore(path).load())
+    results[-1]["memory_bytes"] = int(farmers_df.memory_usage(deep=True).sum())
+    config.SNAPSHOTS = snapshots
+    if snapshots:
+        # A fresh process maps the Arrow snapshot written by the first load instead of parsing the CSV
+        data_store.CsvStore(path).load()
+        record("load_snapshot_cold", lambda: data_store.CsvStore(path).load())
+
+    store = data_store.CsvStore(path)
+    data_store.set_store(store)
+    store.load()
+    record("load_cached", store.load)
+
+    new_farmers = iter(generate_farmers(repeat * 10, seed=seed + 1, start=rows).to_dict(orient="records"))
+    record("register_one", lambda: store.append(next(new_farmers)), times=repeat * 10)
+    batch = generate_farmers(1000, seed=seed + 2, start=rows + repeat * 10)
+    record("register_batch_1000", lambda: store.append_many(batch), times=1)
+    queued = generate_farmers(1000, seed=seed + 3, start=rows + repeat * 10 + 1000).to_dict(orient="records")
+
+    def register_queued():
+        for farmer in queued:
+            data_store.submit_farmer(farmer)
+        data_store.flush_farmers()
+
+    record("register_queued_1000", register_queued, times=1)
+
+    farmers_df = store.load()
+    record("price_frame", lambda: pricing.price_frame(farmers_df))
+    record("filter_province_insurance", lambda: store.query(province="Punjab", insurance="Flood Protection"))
+    # The first call builds the view; the timed repeats are served from the view cache
+    record("view_cached", lambda: data_store.filtered_view(province="Punjab", insurance="Flood Protection", search="khan"))
+
+    index = record("search_index_build", lambda: build_search_index(farmers_df), times=1)
+    # A re-registration drops the farmer's earlier row and appends the new one
+    reregistered_df = pd.concat([farmers_df.iloc[1:], farmers_df.iloc[:1]], ignore_index=True)
+    record("search_index_reregistration", lambda: index.update(reregistered_df), times=1)
+    record("search_trigram", lambda: search_index.search_rows(farmers_df, "khan12"))
+    record("search_short_scan", lambda: search_index.search_rows(farmers_df, "kh"))
+
+    record("identity_index_build", lambda: identity_index.IdentityIndex.from_frame(farmers_df), times=1)
+    email = farmers_df["Email"].iat[len(farmers_df) // 2]
+    record("email_lookup", lambda: store.find_email(email))
+
+    record("cube_build", lambda: cube.AggregateCube.from_frame(farmers_df), times=1)
+    record("summary_by_province", lambda: store.summary_by("Province"))
+    record("totals_filtered", lambda: store.totals(province="Punjab", insurance="Flood Protection"))
+    record("summary_by_insurance", lambda: store.summary_by("Insurance"))
+    record("histogram_bins", lambda: views.histogram_bins(farmers_df["Farm Size"]))
+    record("paginate_sorted", lambda: views.paginate(farmers_df, 1, 50, sort_by="Farm Size"))
+    payload = record("figures", lambda: build_dashboard_figures(farmers_df))
+    results[-1]["payload_bytes"] = payload
+    record("export_csv_gzip", lambda: export.export_file(farmers_df, "CSV (gzip)"), times=1)
+
+    if run_pages:
+        farmer_id = farmers_df["Farmer ID"].iat[0]
+        for page in PAGES:
+            record(f"page:{os.path.basename(page)}", lambda page=page: run_page(page, farmer_id))
+
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrishield synthetic-registry benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000],
+                        help="registry sizes to benchmark (up to 10M)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="timed repetitions per stage")
+    parser.add_argument("--no-pages", action="store_true", help="skip the AppTest page runs")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in args.rows:
+            print(f"Benchmarking {rows:,} rows...", file=sys.stderr)
+            report["results"].extend(bench_size(rows, args.seed, args.repeat, workdir, not args.no_pages))
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Bulk registration from a cooperative's CSV or Excel spreadsheet.
+
+``validate()`` checks every row at once with vectorized pandas operations
+and returns the importable rows plus one error line per failed check, using
+spreadsheet row numbers (the header is row 1). Valid rows are then written
+in a single batched append. Used by pages/5_bulk_import.py and
+``python manage.py import``.
+"""
+import numpy as np
+import pandas as pd
+
+from data_store import registered_emails
+from schema import FIELDS, check_fields
+
+EMAIL_PATTERN = r"[^@\s]+@[^@\s]+\.[^@\s]+"
+FIRST_DATA_ROW = 2
+
+
+class ImportFileError(ValueError):
+    """The uploaded file cannot be read or lacks required columns."""
+
+
+def read_table(source, file_name):
+    """Read a CSV or .xlsx upload with every cell as text."""
+    if file_name.lower().endswith(".xls"):
+        raise ImportFileError("Old-style .xls files cannot be read; save the sheet as .xlsx or .csv")
+    if file_name.lower().endswith(".xlsx"):
+        try:
+            return pd.read_excel(source, dtype=str)
+        except ImportError as exc:
+            raise ImportFileError("Reading Excel files requires the openpyxl package") from exc
+    return pd.read_csv(source, dtype=str, keep_default_na=False)
+
+
+def validate(raw_df, existing_emails=None):
+    """Split an uploaded table into (valid_df, errors_df).
+
+    ``errors_df`` has one row per failed check with columns Row, Column and
+    Error. Headers are matched case-insensitively; field rules and
+    normalization come from ``schema.check_fields()``. Emails already
+    registered are looked up in the store's email index unless
+    ``existing_emails`` (lowercased) is given.
+    """
+    headers = {column.lower(): column for column in FIELDS}
+    farmers_df = raw_df.rename(columns=lambda column: headers.get(str(column).strip().lower(), column))
+    missing = [column for column in FIELDS if column not in farmers_df.columns]
+    if missing:
+        raise ImportFileError(f"Missing column(s): {', '.join(missing)}")
+
+    farmers_df, problems = check_fields(farmers_df)  # problems: [(row mask, column, message)]
+
+    email = farmers_df["Email"].str.lower()
+    has_email = email != ""
+    problems.append((has_email & ~email.str.fullmatch(EMAIL_PATTERN), "Email", "is not a valid email address"))
+    problems.append((has_email & email.duplicated(keep="first"), "Email", "duplicates an earlier row in this file"))
+    if existing_emails is None:
+        existing_emails = registered_emails(email[has_email].unique())
+    problems.append((has_email & email.isin(existing_emails), "Email", "is already registered"))
+
+    invalid = np.zeros(len(farmers_df), dtype=bool)
+    errors = []
+    for mask, column, message in problems:
+        mask = mask.to_numpy(dtype=bool)
+        invalid |= mask
+        rows = np.flatnonzero(mask)
+        if rows.size:
+            errors.append(pd.DataFrame({"Row": rows + FIRST_DATA_ROW, "Column": column, "Error": f"{column} {message}"}))
+
+    errors_df = (
+        pd.concat(errors, ignore_index=True).sort_values("Row", kind="stable", ignore_index=True)
+        if errors else pd.DataFrame(columns=["Row", "Column", "Error"])
+    )
+    valid_df = farmers_df[~invalid].astype({"Age": int})
+    return valid_df.reset_index(drop=True), errors_df
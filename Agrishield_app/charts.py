@@ -0,0 +1,142 @@
+"""Plotly figures for the pages, built from small server-side aggregates.
+
+Pages import this module only inside the fragment that draws the chart
+currently on screen, so Plotly itself is not imported, and no figure is
+built, until a chart is actually shown.
+"""
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+def payout_trend(payout_df):
+    """Area chart of estimated payout against farm size (page 2)."""
+    fig = px.area(
+        payout_df, x="Farm Size (Acres)", y="Payout (PKR)",
+        title="📈 Estimated Payout Increase by Farm Size",
+        color_discrete_sequence=["#1f77b4"]
+    )
+    fig.update_traces(fill='tozeroy', line=dict(width=2))
+    return fig
+
+
+def payout_donut(distribution):
+    """Donut of farmers per insurance type (page 2)."""
+    return px.pie(
+        distribution, names="Insurance Type", values="Count",
+        title="🟡 Payout Distribution by Insurance Type",
+        hole=0.5, color_discrete_sequence=px.colors.sequential.Viridis
+    )
+
+
+def premium_by_province(province_data):
+    """Stacked area of farm size and premium per province (page 3)."""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=province_data["Province"],
+        y=province_data["Farm Size"],
+        fill='tozeroy',
+        mode='none',
+        name="Farm Size (acres)",
+        line=dict(color="#FF5733")
+    ))
+    fig.add_trace(go.Scatter(
+        x=province_data["Province"],
+        y=province_data["Total Premium"],
+        fill='tonexty',
+        mode='none',
+        name="Total Premium",
+        line=dict(color="#1E90FF")
+    ))
+    fig.update_layout(
+        title="📊 Stacked Area Chart - Premium & Farm Size by Province",
+        xaxis_title="Province",
+        yaxis_title="Value",
+        paper_bgcolor="#FFFFFF",
+        plot_bgcolor="#FFFFFF",
+        font=dict(color="black"),
+        showlegend=True
+    )
+    return fig
+
+
+def insurance_pie(insurance_counts):
+    """Pie of farmers per insurance type (page 3)."""
+    fig = px.pie(insurance_counts, names="Insurance Type", values="Count",
+                 title="📊 Insurance Type Distribution",
+                 color_discrete_sequence=px.colors.qualitative.Set1)
+    fig.update_traces(textposition="inside", textinfo="percent+label")
+    fig.update_layout(paper_bgcolor="#FFFFFF", font=dict(color="black"))
+    return fig
+
+
+def province_pie(province_counts):
+    """Pie of farmers per province (dashboard)."""
+    fig = px.pie(
+        province_counts,
+        names="Province",
+        values="Count",
+        title="🗺️ Farmer Distribution by Province",
+        color_discrete_sequence=px.colors.qualitative.Set1
+    )
+    fig.update_traces(textposition="inside", textinfo="percent+label")
+    fig.update_layout(paper_bgcolor="#F8F9FA", font=dict(color="black"))
+    return fig
+
+
+def farm_size_histogram(farm_size_bins):
+    """Bar chart of pre-binned farm sizes from ``views.histogram_bins()`` (dashboard)."""
+    fig = px.bar(
+        farm_size_bins,
+        x="Bin Centre",
+        y="Count",
+        hover_data=["Bin Start", "Bin End"],
+        labels={"Bin Centre": "Farm Size", "Count": "count"},
+        title="📏 Farm Size Distribution",
+        color_discrete_sequence=["#004080"]
+    )
+    fig.update_traces(width=farm_size_bins["Bin End"] - farm_size_bins["Bin Start"])
+    fig.update_layout(paper_bgcolor="#F8F9FA", font=dict(color="black"), bargap=0)
+    return fig
+
+
+def premium_payout_box(stats_by_column):
+    """Box plot from ``views.box_stats()`` summaries keyed by "Premium" / "Payout" (dashboard)."""
+    fig = go.Figure()
+    for column, color in [("Premium", "#007acc"), ("Payout", "#28a745")]:
+        stats = stats_by_column[column]
+        fig.add_trace(go.Box(
+            x=[column], name=column, marker_color=color,
+            q1=[stats["q1"]], median=[stats["median"]], q3=[stats["q3"]],
+            lowerfence=[stats["lowerfence"]], upperfence=[stats["upperfence"]],
+        ))
+        if stats["outliers"].size:
+            fig.add_trace(go.Scatter(
+                x=[column] * stats["outliers"].size, y=stats["outliers"], mode="markers",
+                marker=dict(color=color), name=f"{column} outliers", showlegend=False,
+            ))
+    fig.update_layout(
+        title="💰 Premium vs. Payout Analysis", xaxis_title="variable", yaxis_title="value",
+        paper_bgcolor="#F8F9FA", font=dict(color="black")
+    )
+    return fig
+
+
+def loss_distribution(loss_bins, summary, level="99%"):
+    """Histogram of simulated season losses with VaR/TVaR markers (page 3)."""
+    fig = px.bar(
+        loss_bins,
+        x="Bin Centre",
+        y="Count",
+        hover_data=["Bin Start", "Bin End"],
+        labels={"Bin Centre": "Season Loss (PKR)", "Count": "Simulated seasons"},
+        title="🎲 Simulated Seasonal Loss Distribution",
+        color_discrete_sequence=["#004080"]
+    )
+    fig.update_traces(width=loss_bins["Bin End"] - loss_bins["Bin Start"])
+    for name, color in [(f"VaR {level}", "#FF5733"), (f"TVaR {level}", "#C70039")]:
+        fig.add_vline(x=summary[name], line_dash="dash", line_color=color,
+                      annotation_text=name, annotation_position="top")
+    fig.add_vline(x=summary["Premium"], line_color="#28a745", annotation_text="Premium",
+                  annotation_position="top left")
+    fig.update_layout(paper_bgcolor="#FFFFFF", font=dict(color="black"), bargap=0)
+    return fig
@@ -0,0 +1,39 @@
+"""Runtime settings for Agrishield, overridable through environment variables.
+
+AGRISHIELD_STORAGE       "csv" (default), "partitioned" (one CSV per province) or "sqlite"
+AGRISHIELD_CSV           registry CSV file (default: farmers_data.csv next to app.py)
+AGRISHIELD_PARTITIONS    folder of per-province CSVs (default: farmers_by_province next to app.py)
+AGRISHIELD_SNAPSHOT      "1" (default) keeps a memory-mapped Arrow snapshot next to each registry
+                         CSV for fast cold starts; "0" always parses the CSV
+AGRISHIELD_DB            SQLite database file (default: farmers_data.db next to app.py)
+AGRISHIELD_METRICS_FILE  Prometheus text file of page timings, written once per app process
+                         with its PID before the extension (default: metrics.prom next to
+                         app.py, so metrics.4242.prom; set it empty to disable)
+AGRISHIELD_METRICS_PORT  also serve those metrics at http://127.0.0.1:PORT/metrics
+AGRISHIELD_ADMIN_TOKEN   token that unlocks the Ops Metrics page (disabled when unset)
+AGRISHIELD_WRITE_BATCH   registrations per background write batch (default 200; 0 writes
+                         each registration synchronously)
+AGRISHIELD_WRITE_DELAY   seconds a registration may wait for its batch to fill (default 0.5)
+AGRISHIELD_WRITE_QUEUE   registrations allowed to wait before the form pushes back (default 5000)
+AGRISHIELD_VIEW_CACHE_MB memory for cached dashboard views and charts, shared by all
+                         sessions (default 64)
+AGRISHIELD_LIVE_REFRESH  seconds between open dashboard/premium pages checking for new
+                         registrations (default 5; 0 turns live refresh off)
+"""
+import os
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STORAGE_BACKEND = os.environ.get("AGRISHIELD_STORAGE", "csv").lower()
+CSV_FILE = os.environ.get("AGRISHIELD_CSV", os.path.join(APP_DIR, "farmers_data.csv"))
+PARTITION_DIR = os.environ.get("AGRISHIELD_PARTITIONS", os.path.join(APP_DIR, "farmers_by_province"))
+SNAPSHOTS = os.environ.get("AGRISHIELD_SNAPSHOT", "1") != "0"
+SQLITE_FILE = os.environ.get("AGRISHIELD_DB", os.path.join(APP_DIR, "farmers_data.db"))
+METRICS_FILE = os.environ.get("AGRISHIELD_METRICS_FILE", os.path.join(APP_DIR, "metrics.prom"))
+METRICS_PORT = os.environ.get("AGRISHIELD_METRICS_PORT", "")
+ADMIN_TOKEN = os.environ.get("AGRISHIELD_ADMIN_TOKEN", "")
+WRITE_BATCH_ROWS = int(os.environ.get("AGRISHIELD_WRITE_BATCH", "200"))
+WRITE_FLUSH_SECONDS = float(os.environ.get("AGRISHIELD_WRITE_DELAY", "0.5"))
+WRITE_QUEUE_SIZE = int(os.environ.get("AGRISHIELD_WRITE_QUEUE", "5000"))
+VIEW_CACHE_MB = float(os.environ.get("AGRISHIELD_VIEW_CACHE_MB", "64"))
+LIVE_REFRESH_SECONDS = float(os.environ.get("AGRISHIELD_LIVE_REFRESH", "5"))
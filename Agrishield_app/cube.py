@@ -0,0 +1,113 @@
+"""Materialized aggregate cube of the registry.
+
+One cell per (Province, Insurance, Climate Issue) holds the number of
+farmers and their total farm size; that is at most a few hundred cells
+however many farmers register. Premium and payout are linear in farm size
+within a cell, so their sums are priced from the cell totals with the
+current rate tables (``pricing.price_arrays()``) and never go stale when a
+rate changes.
+
+KPI tiles, summaries and pie/bar chart inputs (``rollup()`` and
+``totals()``) read the cube instead of the rows. Stores keep it current:
+SQLite in a ``farmer_cube`` table maintained by triggers, the CSV stores in
+memory, folding in their own writes as deltas (see
+``BaseStore._written()``). Cubes are immutable; an update builds a new one,
+so readers never see a half-applied write.
+"""
+import numpy as np
+import pandas as pd
+
+from pricing import climate_codes, insurance_codes, price_arrays
+from schema import CATEGORY_OPTIONS
+
+CUBE_DIMENSIONS = ["Province", "Insurance", "Climate Issue"]
+CUBE_MEASURES = ["Farmers", "Farm Size"]
+
+
+def _cells(farmers_df):
+    """Cube cells for a farmer table (dimension values as plain strings)."""
+    keys = [farmers_df[column].astype(object) for column in CUBE_DIMENSIONS]
+    cells = (
+        farmers_df["Farm Size"].astype(np.float64)
+        .groupby(keys, dropna=False, sort=False)
+        .agg(["size", "sum"])
+        .reset_index()
+    )
+    cells.columns = CUBE_DIMENSIONS + CUBE_MEASURES
+    return cells
+
+
+def _summed(cells):
+    """Add up cells that share a key, dropping the ones that reached zero farmers."""
+    cells = cells.groupby(CUBE_DIMENSIONS, dropna=False, sort=False)[CUBE_MEASURES].sum().reset_index()
+    return cells[cells["Farmers"] > 0].reset_index(drop=True)
+
+
+def _ordered(frame, column):
+    """``frame`` sorted by ``column`` in schema option order, unknown values last."""
+    order = {value: position for position, value in enumerate(CATEGORY_OPTIONS.get(column, []))}
+    return frame.sort_values(column, key=lambda values: values.map(order).fillna(len(order)), kind="stable")
+
+
+class AggregateCube:
+    def __init__(self, cells):
+        self.cells = cells  # columns: CUBE_DIMENSIONS + CUBE_MEASURES
+
+    @classmethod
+    def from_frame(cls, farmers_df):
+        return cls(_summed(_cells(farmers_df)))
+
+    @classmethod
+    def combine(cls, cubes):
+        """One cube from several, e.g. one per province partition."""
+        frames = [cube.cells for cube in cubes]
+        if not frames:
+            return cls.from_frame(pd.DataFrame(columns=CUBE_DIMENSIONS + ["Farm Size"]))
+        return cls(_summed(pd.concat(frames, ignore_index=True)))
+
+    def plus(self, added_df, removed_df=None):
+        """A new cube with the rows of ``added_df`` counted and those of ``removed_df`` taken out."""
+        parts = [self.cells, _cells(added_df)]
+        if removed_df is not None:
+            removed = _cells(removed_df)
+            removed[CUBE_MEASURES] = -removed[CUBE_MEASURES]
+            parts.append(removed)
+        return AggregateCube(_summed(pd.concat(parts, ignore_index=True)))
+
+    def priced(self, province=None, insurance=None):
+        """Cells matching the filters, with Premium and Payout sums added."""
+        cells = self.cells
+        if province is not None:
+            cells = cells[cells["Province"] == province]
+        if insurance is not None:
+            cells = cells[cells["Insurance"] == insurance]
+        premium, _, payout = price_arrays(
+            insurance_codes(cells["Insurance"]),
+            climate_codes(cells["Climate Issue"]),
+            cells["Farm Size"].to_numpy(dtype=np.float64),
+        )
+        return cells.assign(Premium=premium, Payout=payout)
+
+    def rollup(self, column, province=None, insurance=None):
+        """Farmers, Farm Size, Premium and Payout per value of ``column``, in schema order."""
+        summary = (
+            self.priced(province, insurance)
+            .groupby(column, sort=False)[["Farmers", "Farm Size", "Premium", "Payout"]]
+            .sum()
+            .reset_index()
+        )
+        return _ordered(summary, column).reset_index(drop=True)
+
+    def totals(self, province=None, insurance=None):
+        """Farmers, Farm Size, Premium and Payout over every cell matching the filters."""
+        cells = self.priced(province, insurance)
+        return {
+            "Farmers": int(cells["Farmers"].sum()),
+            "Farm Size": float(cells["Farm Size"].sum()),
+            "Premium": float(cells["Premium"].sum()),
+            "Payout": float(cells["Payout"].sum()),
+        }
+
+    def values(self, column):
+        """Values of a cube dimension that have farmers, sorted."""
+        return sorted(self.cells[column].dropna().unique())
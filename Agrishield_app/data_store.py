@@ -0,0 +1,728 @@
+"""Shared access to the farmer registry.
+
+All pages go through the module-level helpers below (``load_farmers()``,
+``filtered_view()``, ``summary_by()`` ...), which delegate to the backend
+chosen in config.py: the flat CSV file, one CSV per province (see
+partitioned_store.py) or SQLite (see sqlite_store.py).
+
+Whatever the backend, the full table is kept once per process and shared by
+every session; it is only re-read when the backend's version key changes.
+A CSV that only grew is brought up to date by parsing just the new lines,
+and a process starting up maps the CSV's Arrow snapshot (see snapshot.py)
+instead of parsing the whole file.
+Counts, areas, premium and payout totals per Province x Insurance x Climate
+Issue come from an aggregate cube (see cube.py), so ``summary_by()`` and
+``farmer_totals()`` never scan the rows.
+
+Each farmer gets a short random "Farmer ID" at registration. Sessions keep
+only that ID and fetch their own record with ``get_farmer()``.
+
+Each email is registered once. Stores keep a hash index of emails and of
+name + province (see identity_index.py), so ``farmer_id_for_email()`` and
+bulk imports check for duplicates without scanning the table, and
+``update_farmer()`` re-registers a farmer under their existing Farmer ID.
+
+CSV writes are append-only: ``append()`` adds one line under an exclusive
+lock and fsyncs it, an update appends the new version of the row (the last
+row with a given Farmer ID wins), and ``compact()`` is the offline step that
+rewrites and normalizes the whole file. The registration form goes through
+``submit_farmer()``, which queues the record for a background writer that
+stores registrations in batches (see registration_writer.py).
+"""
+import csv
+import io
+import os
+import secrets
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+import config
+from cube import CUBE_DIMENSIONS, AggregateCube
+from identity_index import IdentityIndex, email_key
+from metrics import span
+from schema import COLUMNS, READ_DTYPES, apply_schema, conform_frame, conform_record, normalize_crop
+from search_index import search_rows
+from snapshot import read_snapshot, snapshot_path, snapshot_position, write_snapshot
+from view_cache import shared_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, appends are only serialized in-process
+    fcntl = None
+
+TAIL_CHECK_BYTES = 256  # bytes compared to tell that the registry file only grew since it was read
+SNAPSHOT_LAG_BYTES = 4 * 1024 * 1024  # CSV appended after the Arrow snapshot before it is rewritten
+
+
+class DuplicateEmailError(ValueError):
+    """The email is already registered; ``farmer_id`` is that registration's ID when known."""
+
+    def __init__(self, message, farmer_id=None):
+        super().__init__(message)
+        self.farmer_id = farmer_id
+
+
+class BaseStore:
+    """Version-cached full-table access plus pandas fallbacks for queries.
+
+    Subclasses provide ``version()``, ``_read_all()``, ``append()``,
+    ``append_many()`` and ``update()``, and may override the query and
+    duplicate-check helpers with something cheaper than a full scan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cached = (None, None)  # (version, DataFrame)
+        self._id_index = (None, None)  # (DataFrame, pd.Index of its Farmer IDs)
+        self._identities = (None, None)  # (version, IdentityIndex)
+        self._cube = (None, None)  # (version, AggregateCube)
+
+    def load(self):
+        """Return the shared farmer table. Callers must treat it as read-only."""
+        return self.load_versioned()[1]
+
+    def load_versioned(self):
+        """(version, shared farmer table), the version being the one the table was read at."""
+        version = self.version()
+        cached = self._cached
+        if cached[1] is not None and cached[0] == version:
+            return cached
+
+        with self._lock:
+            # Another session may have reloaded while we waited for the lock
+            version = self.version()
+            cached_version, farmers_df = self._cached
+            if farmers_df is None or cached_version != version:
+                newer_df = self._read_newer(farmers_df) if farmers_df is not None else None
+                if newer_df is None:
+                    with span("load") as measured:
+                        newer_df = self._read_all()
+                        measured.rows = len(newer_df)
+                self._cached = (version, newer_df)
+            return self._cached
+
+    def _read_newer(self, farmers_df):
+        """``farmers_df`` brought up to date by reading only what changed, or None to read everything."""
+        return None
+
+    def has_farmers(self):
+        return not self.load().empty
+
+    def scope_version(self, province=None):
+        """Version key of the rows a ``province`` query reads: here the whole store's."""
+        return self.version()
+
+    def scope(self, province=None):
+        """(version, table) holding every row a ``province`` query can return: here the whole table."""
+        return self.load_versioned()
+
+    def query(self, province=None, insurance=None):
+        """Rows matching the given Province / Insurance (None means any)."""
+        farmers_df = self.scope(province)[1]
+        if province is None and insurance is None:
+            return farmers_df
+        return farmers_df.iloc[self.query_positions(farmers_df, province, insurance)]
+
+    def query_positions(self, farmers_df, province=None, insurance=None):
+        """Sorted positions in ``farmers_df``, a ``scope(province)`` table, of the rows ``query()`` returns."""
+        mask = np.ones(len(farmers_df), dtype=bool)
+        if province is not None:
+            mask &= (farmers_df["Province"] == province).to_numpy(dtype=bool, na_value=False)
+        if insurance is not None:
+            mask &= (farmers_df["Insurance"] == insurance).to_numpy(dtype=bool, na_value=False)
+        return np.flatnonzero(mask)
+
+    def cube(self):
+        """The aggregate cube for the current version."""
+        version = self.version()
+        cached_version, cube = self._cube
+        if cube is None or cached_version != version:
+            cube = self._read_cube()
+            self._cube = (version, cube)
+        return cube
+
+    def _read_cube(self):
+        return AggregateCube.from_frame(self.load())
+
+    def summary_by(self, column, province=None, insurance=None):
+        """Farmers, Farm Size, Premium and Payout per value of a cube dimension, from the cube."""
+        return self.cube().rollup(column, province=province, insurance=insurance)
+
+    def totals(self, province=None, insurance=None):
+        """Farmers, Farm Size, Premium and Payout totals for the filters, from the cube."""
+        return self.cube().totals(province=province, insurance=insurance)
+
+    def options(self, column):
+        if column in CUBE_DIMENSIONS:
+            return self.cube().values(column)
+        return sorted(self.load()[column].dropna().unique())
+
+    def get(self, farmer_id):
+        """One farmer's record (a Series), or None if the ID is unknown."""
+        farmers_df = self.load()
+        positions = self._farmer_ids(farmers_df).get_indexer_for([farmer_id])
+        positions = positions[positions >= 0]
+        return farmers_df.iloc[positions[-1]] if positions.size else None
+
+    def _farmer_ids(self, farmers_df):
+        """pd.Index of ``farmers_df``'s Farmer IDs, kept for the table it was last built for."""
+        indexed_df, ids = self._id_index
+        if indexed_df is not farmers_df:
+            ids = pd.Index(farmers_df["Farmer ID"])
+            self._id_index = (farmers_df, ids)
+        return ids
+
+    def find_email(self, email):
+        """Farmer ID registered with ``email`` (any case), or None."""
+        return self._identity_index().find_email(email)
+
+    def find_identity(self, name, province):
+        """Farmer ID most recently registered with this name in this province, or None."""
+        return self._identity_index().find_identity(name, province)
+
+    def taken_emails(self, emails):
+        """The lowercased emails among ``emails`` that are already registered."""
+        return self._identity_index().taken_emails(emails)
+
+    def _identity_index(self):
+        version = self.version()
+        cached_version, index = self._identities
+        if index is None or cached_version != version:
+            index = IdentityIndex.from_frame(self.load())
+            self._identities = (version, index)
+        return index
+
+    def _written(self, version_before, index, added_df, removed_df=None):
+        """Bring the email index and cube up to date with this process's own write.
+
+        ``index`` must already include the write. Call under the write lock,
+        after writing; ``version_before`` is the version read under the same
+        lock before writing. A cube that was already stale is left to be
+        rebuilt on its next use.
+        """
+        version = self.version()
+        self._identities = (version, index)
+        cached_version, cube = self._cube
+        if cube is not None and cached_version == version_before:
+            self._cube = (version, cube.plus(added_df, removed_df))
+
+
+class CsvStore(BaseStore):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._write_counter = 0
+        self._write_lock = threading.Lock()
+        self._read_upto = None  # (inode, bytes, last bytes) of the file as the cached table was read
+        self.snapshot_path = snapshot_path(path) if config.SNAPSHOTS else None
+        self._snapshot_upto = None  # (inode, bytes) of the file as the snapshot on disk was written
+
+    def version(self):
+        """Cheap version key: (mtime, size, in-process write counter)."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return (None, 0, self._write_counter)
+        return (stat.st_mtime_ns, stat.st_size, self._write_counter)
+
+    def has_farmers(self):
+        """True if the file has a row after its header, without loading the table."""
+        try:
+            with open(self.path, "rb") as handle:
+                handle.readline()
+                return any(line.strip(b"\r\n ,") for line in handle)
+        except FileNotFoundError:
+            return False
+
+    def _read_all(self):
+        self._read_upto = None
+        if not os.path.exists(self.path):
+            return apply_schema(pd.DataFrame(columns=COLUMNS))
+        farmers_df = self._read_snapshot()
+        if farmers_df is not None:
+            return farmers_df
+        read_upto = self._file_position()
+        farmers_df = pd.read_csv(self.path, dtype=READ_DTYPES)
+        if list(farmers_df.columns) == COLUMNS:
+            self._read_upto = read_upto
+        if "Farmer ID" not in farmers_df.columns:  # written before IDs existed; see compact()
+            farmers_df = farmers_df.reindex(columns=COLUMNS)
+        superseded = farmers_df["Farmer ID"].duplicated(keep="last") & farmers_df["Farmer ID"].notna()
+        if superseded.any():  # re-registrations: the last row for a Farmer ID is current
+            farmers_df = farmers_df[~superseded].reset_index(drop=True)
+        farmers_df = apply_schema(farmers_df)
+        self._save_snapshot(farmers_df)
+        return farmers_df
+
+    def _read_snapshot(self):
+        """The table from the Arrow snapshot plus the lines appended after it, or None."""
+        if self.snapshot_path is None:
+            return None
+        restored = read_snapshot(self.snapshot_path)
+        if restored is None:
+            return None
+        farmers_df, self._read_upto = restored
+        self._snapshot_upto = self._read_upto[:2]
+        farmers_df = self._read_newer(farmers_df)
+        if farmers_df is None:  # the CSV was rewritten since the snapshot
+            self._read_upto = self._snapshot_upto = None
+        return farmers_df
+
+    def _save_snapshot(self, farmers_df):
+        """Rewrite the Arrow snapshot if it lags the cached table by SNAPSHOT_LAG_BYTES of CSV or more."""
+        if self.snapshot_path is None or self._read_upto is None:
+            return
+        if _snapshot_covers(self._snapshot_upto, self._read_upto):
+            return
+        if self._snapshot_upto is not None:
+            # Another process may have refreshed it already
+            on_disk = snapshot_position(self.snapshot_path)
+            self._snapshot_upto = on_disk[:2] if on_disk is not None else None
+            if _snapshot_covers(self._snapshot_upto, self._read_upto):
+                return
+        try:
+            with span("snapshot_write", rows=len(farmers_df)):
+                if write_snapshot(self.snapshot_path, farmers_df, self._read_upto):
+                    self._snapshot_upto = self._read_upto[:2]
+        except OSError:
+            pass  # a read-only folder only costs the next process a CSV parse
+
+    def _file_position(self, size=None):
+        """(inode, size, last bytes before ``size``) identifying the file's first ``size`` bytes."""
+        with open(self.path, "rb") as handle:
+            stat = os.fstat(handle.fileno())
+            size = stat.st_size if size is None else size
+            handle.seek(max(0, size - TAIL_CHECK_BYTES))
+            return (stat.st_ino, size, handle.read(size - handle.tell()))
+
+    def _read_newer(self, farmers_df):
+        """Parse only the lines appended since ``farmers_df`` was read.
+
+        Registrations and re-registrations only ever append, so a file with
+        the same inode that still ends the previously read part with the same
+        bytes just grew. Anything else (compaction, a removal, a hand edit)
+        falls back to reading the whole file.
+        """
+        if self._read_upto is None:
+            return None
+        inode, size, tail = self._read_upto
+        try:
+            with open(self.path, "rb") as handle:
+                if os.fstat(handle.fileno()).st_ino != inode:
+                    return None
+                handle.seek(max(0, size - TAIL_CHECK_BYTES))
+                if handle.read(size - handle.tell()) != tail or not tail.endswith(b"\n"):
+                    return None
+                data = handle.read()
+        except FileNotFoundError:
+            return None
+        data = data[:data.rfind(b"\n") + 1]  # a line still being written waits for the next read
+        if not data:
+            return farmers_df
+        with span("load_delta") as measured:
+            added_df = pd.read_csv(io.BytesIO(data), header=None, names=COLUMNS, dtype=READ_DTYPES)
+            measured.rows = len(added_df)
+            self._read_upto = self._file_position(size + len(data))
+            # A re-registration replaces the earlier row for its Farmer ID
+            added_df = added_df[~(added_df["Farmer ID"].duplicated(keep="last") & added_df["Farmer ID"].notna())]
+            replaced = farmers_df["Farmer ID"].isin(added_df["Farmer ID"].dropna())
+            if replaced.any():
+                farmers_df = farmers_df[~replaced]
+            farmers_df = _stacked(farmers_df, apply_schema(added_df))
+        self._save_snapshot(farmers_df)
+        return farmers_df
+
+    def _bump_version(self):
+        self._write_counter += 1
+
+    @contextmanager
+    def _exclusive(self):
+        """Hold the registry write lock across threads and processes.
+
+        The lock lives in a sidecar file so it survives ``compact()`` replacing
+        the CSV itself.
+        """
+        with self._write_lock, open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _append_lines(self, data):
+        """Append encoded CSV lines; call while holding ``_exclusive()``."""
+        if _header_line(self.path) not in (None, _csv_lines([], header=True).rstrip()):
+            self._compact_locked()  # upgrade an older layout before appending to it
+        with open(self.path, "ab+") as handle:
+            handle.seek(0, os.SEEK_END)
+            if handle.tell() == 0:
+                handle.write(_csv_lines([], header=True))
+            else:
+                # Guard against a hand-edited file without a trailing newline
+                handle.seek(-1, os.SEEK_END)
+                if handle.read(1) not in (b"\n", b"\r"):
+                    handle.write(b"\r\n")
+            handle.write(data)
+            handle.flush()
+            os.fsync(handle.fileno())
+        self._bump_version()
+
+    def append(self, record):
+        """Append a single registration (dict keyed by FIELDS). Returns its Farmer ID.
+
+        Raises DuplicateEmailError if the email is already registered.
+        """
+        record = conform_record({**record, "Farmer ID": record.get("Farmer ID") or new_farmer_id()})
+        with self._exclusive():
+            return self._append_locked(record)
+
+    def _append_locked(self, record):
+        """``append()`` of a conformed record; call while holding ``_exclusive()``."""
+        version = self.version()
+        index = self._identity_index()
+        existing_id = index.find_email(record["Email"])
+        if existing_id is not None:
+            raise DuplicateEmailError(f"{record['Email']} is already registered", existing_id)
+        self._append_lines(_csv_lines([record]))
+        index.add([record])
+        self._written(version, index, pd.DataFrame([record]))
+        return record["Farmer ID"]
+
+    def append_many(self, farmers_df):
+        """Append many rows with one lock, one write and one fsync, skipping duplicate emails.
+
+        Returns rows written.
+        """
+        if farmers_df.empty:
+            return 0
+        farmers_df = conform_frame(with_farmer_ids(farmers_df))
+        keys = farmers_df["Email"].str.lower()
+        with self._exclusive():
+            version = self.version()
+            index = self._identity_index()
+            fresh = ~keys.duplicated(keep="first") & ~keys.map(index.emails.__contains__).astype(bool)
+            farmers_df = farmers_df.loc[fresh, COLUMNS]
+            if not farmers_df.empty:
+                self._append_lines(_csv_lines(farmers_df.astype(object).to_dict(orient="records")))
+                index.merge(IdentityIndex.from_frame(farmers_df))
+                self._written(version, index, farmers_df)
+        return len(farmers_df)
+
+    def update(self, farmer_id, record):
+        """Replace the registration ``farmer_id`` with ``record``. Returns the Farmer ID.
+
+        The new version is appended with the same Farmer ID and supersedes
+        the old row when the file is read. Raises KeyError for an unknown
+        Farmer ID and DuplicateEmailError if the new email belongs to
+        another farmer.
+        """
+        record = conform_record({**record, "Farmer ID": farmer_id})
+        with self._exclusive():
+            version = self.version()
+            current = self.get(farmer_id)
+            if current is None:
+                raise KeyError(farmer_id)
+            index = self._identity_index()
+            existing_id = index.find_email(record["Email"])
+            if existing_id not in (None, farmer_id):
+                raise DuplicateEmailError(f"{record['Email']} is already registered", existing_id)
+            self._append_lines(_csv_lines([record]))
+            index.add([record], replaced=current)
+            self._written(version, index, pd.DataFrame([record]), current.to_frame().T)
+        return farmer_id
+
+    def compact(self):
+        """Rewrite the registry in canonical form. Returns (rows_before, rows_after).
+
+        Trims stray whitespace, normalizes crop names, drops blank and
+        exact-duplicate rows and rows superseded by a re-registration,
+        restores the canonical column order and gives every row a Farmer ID.
+        Meant to run offline (see manage.py).
+        """
+        with self._exclusive():
+            return self._compact_locked()
+
+    def _compact_locked(self):
+        if not os.path.exists(self.path):
+            return (0, 0)
+        farmers_df = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+        rows_before = len(farmers_df)
+
+        farmers_df = farmers_df.reindex(columns=COLUMNS, fill_value="")
+        farmers_df = farmers_df.apply(lambda column: column.str.strip())
+        farmers_df["Crop Type"] = farmers_df["Crop Type"].map(normalize_crop)
+        farmers_df = farmers_df[(farmers_df != "").any(axis=1)].drop_duplicates()
+        farmers_df = with_farmer_ids(farmers_df).drop_duplicates("Farmer ID", keep="last")
+        self._replace_file(farmers_df.to_dict(orient="records"))
+        return (rows_before, len(farmers_df))
+
+    def remove(self, farmer_id):
+        """Rewrite the file without ``farmer_id``'s rows. Returns the number of rows removed."""
+        with self._exclusive():
+            return self._remove_locked(farmer_id)
+
+    def _remove_locked(self, farmer_id):
+        """``remove()``; call while holding ``_exclusive()``."""
+        if not os.path.exists(self.path):
+            return 0
+        farmers_df = pd.read_csv(self.path, dtype=str, keep_default_na=False)
+        removed = farmers_df["Farmer ID"] == farmer_id
+        if removed.any():
+            self._replace_file(farmers_df[~removed].to_dict(orient="records"))
+        return int(removed.sum())
+
+    def _replace_file(self, records):
+        """Atomically replace the file with ``records``; call while holding ``_exclusive()``."""
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as handle:
+            handle.write(_csv_lines(records, header=True))
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_path, self.path)
+        self._bump_version()
+
+
+def new_farmer_id():
+    return secrets.token_hex(8)
+
+
+def with_farmer_ids(farmers_df):
+    """``farmers_df`` with a fresh Farmer ID filled in wherever one is missing."""
+    ids = farmers_df["Farmer ID"] if "Farmer ID" in farmers_df.columns else pd.Series("", index=farmers_df.index)
+    missing = ids.isna() | (ids.astype(str).str.strip() == "")
+    if not missing.any():
+        return farmers_df
+    ids = ids.astype(object).copy()
+    ids[missing] = [new_farmer_id() for _ in range(int(missing.sum()))]
+    return farmers_df.assign(**{"Farmer ID": ids})
+
+
+def _snapshot_covers(snapshot_upto, read_upto):
+    """True if a snapshot of the file's first ``snapshot_upto`` bytes lags ``read_upto`` by less than SNAPSHOT_LAG_BYTES."""
+    return (
+        snapshot_upto is not None and snapshot_upto[0] == read_upto[0]
+        and read_upto[1] - snapshot_upto[1] < SNAPSHOT_LAG_BYTES
+    )
+
+
+def _stacked(farmers_df, added_df):
+    """``added_df`` appended to ``farmers_df``, both already in schema dtypes.
+
+    New rows take the table's categories, so stacking keeps its categorical
+    columns as they are; only a category the table lacks (say, a new crop)
+    makes the whole table's dtypes get rebuilt.
+    """
+    for column, dtype in farmers_df.dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype) and added_df[column].dtype != dtype:
+            if not added_df[column].dropna().isin(dtype.categories).all():
+                return apply_schema(pd.concat([farmers_df, added_df], ignore_index=True))
+            added_df = added_df.assign(**{column: added_df[column].astype(dtype)})
+    return pd.concat([farmers_df, added_df], ignore_index=True)
+
+
+def _header_line(path):
+    """First line of the CSV as bytes without its line ending, or None if empty/missing."""
+    try:
+        with open(path, "rb") as handle:
+            return handle.readline().rstrip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _csv_lines(rows, header=False):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")  # the registry file is LF, like the CSV it started as
+    if header:
+        writer.writerow(COLUMNS)
+    for row in rows:
+        writer.writerow([row[column] for column in COLUMNS])
+    return buffer.getvalue().encode("utf-8")
+
+
+_store = None
+_writer = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide store for the configured backend."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if config.STORAGE_BACKEND == "sqlite":
+                    from sqlite_store import SqliteStore
+                    _store = SqliteStore(config.SQLITE_FILE)
+                elif config.STORAGE_BACKEND == "partitioned":
+                    from partitioned_store import PartitionedStore
+                    _store = PartitionedStore(config.PARTITION_DIR)
+                elif config.STORAGE_BACKEND == "csv":
+                    _store = CsvStore(config.CSV_FILE)
+                else:
+                    raise ValueError(f"Unknown AGRISHIELD_STORAGE backend: {config.STORAGE_BACKEND!r}")
+    return _store
+
+
+def set_store(store):
+    """Replace the process-wide store, e.g. to point benchmarks at a synthetic registry."""
+    global _store, _writer
+    with _store_lock:
+        if _writer is not None:
+            _writer.close()  # writes what is still queued to the old store
+        _store, _writer = store, None
+    shared_cache().clear()  # cached views are keyed by the old store's versions
+
+
+def get_writer():
+    """The process-wide background registration writer, or None if AGRISHIELD_WRITE_BATCH is 0."""
+    global _writer
+    if _writer is None and config.WRITE_BATCH_ROWS > 0:
+        store = get_store()
+        with _store_lock:
+            if _writer is None:
+                from registration_writer import RegistrationWriter
+                _writer = RegistrationWriter(
+                    store,
+                    batch_rows=config.WRITE_BATCH_ROWS,
+                    flush_seconds=config.WRITE_FLUSH_SECONDS,
+                    max_pending=config.WRITE_QUEUE_SIZE,
+                )
+    return _writer
+
+
+def data_version(province=None):
+    """Cheap version key of the registry, or of the part of it a ``province`` view reads."""
+    return get_store().scope_version(province)
+
+
+def load_farmers():
+    return get_store().load()
+
+
+def has_farmers():
+    return get_store().has_farmers()
+
+
+def append_farmer(record):
+    """Store one registration and return its new Farmer ID."""
+    with span("register_write", rows=1):
+        return get_store().append(record)
+
+
+def submit_farmer(record):
+    """Queue one registration for the background writer and return its Farmer ID at once.
+
+    ``get_farmer()`` sees the record immediately; it reaches the store with
+    the next batch. If that batch fails for good, ``registration_error()``
+    says why. Writes synchronously when background writes are disabled.
+    """
+    writer = get_writer()
+    if writer is None:
+        return append_farmer(record)
+    with span("register_enqueue", rows=1):
+        farmer_id, _ = writer.submit(record)
+    return farmer_id
+
+
+def registration_error(farmer_id):
+    """The error that kept a queued registration from being stored, or None if it was not lost."""
+    return _writer.failure(farmer_id) if _writer is not None else None
+
+
+def update_farmer(farmer_id, record):
+    """Re-register ``farmer_id`` with the details in ``record``, keeping its Farmer ID."""
+    flush_farmers()  # a queued first registration must be stored before it can be replaced
+    with span("register_update", rows=1):
+        return get_store().update(farmer_id, record)
+
+
+def farmer_id_for_email(email):
+    """Farmer ID registered (or queued) with ``email``, or None. A hash lookup, not a scan."""
+    farmer_id = _writer.queued_email(email) if _writer is not None else None
+    return farmer_id if farmer_id is not None else get_store().find_email(email)
+
+
+def farmer_id_for_identity(name, province):
+    """Farmer ID most recently registered with this name in this province, or None."""
+    return get_store().find_identity(name, province)
+
+
+def registered_emails(emails):
+    """The lowercased emails among ``emails`` that are already registered or queued."""
+    taken = get_store().taken_emails(emails)
+    if _writer is not None:
+        taken |= {email_key(email) for email in emails if _writer.queued_email(email) is not None}
+    return taken
+
+
+def flush_farmers(timeout=None):
+    """Wait until every queued registration is stored. Returns True if that happened in time."""
+    return _writer.flush(timeout) if _writer is not None else True
+
+
+def append_farmers(farmers_df):
+    """Batched write of already-validated rows. Returns the number of rows stored."""
+    with span("import_write", rows=len(farmers_df)):
+        return get_store().append_many(farmers_df)
+
+
+def filtered_view(province=None, insurance=None, search=None):
+    """(view key, rows) for the dashboard's filters and Name/Email search.
+
+    Rows come from the store's ``query_positions()`` over ``scope(province)``,
+    so a partitioned store reads only that province's file; the filters are
+    masks over the table already loaded. Their positions in the scope's table
+    are kept in the process-wide view cache (see view_cache.py) under the key, which
+    includes the version of what was read; pass the key to
+    ``view_cache.cached_figure()`` to cache the view's charts too.
+    """
+    store = get_store()
+    version, farmers_df = store.scope(province)
+    key = (version, province, insurance, search or None)
+    if province is None and insurance is None and not search:
+        return key, farmers_df
+    with span("view") as measured:
+        positions = shared_cache().get_or_build(
+            key, lambda: _view_positions(store, farmers_df, province, insurance, search)
+        )
+        matches = farmers_df.iloc[positions]
+        measured.rows = len(matches)
+    return key, matches
+
+
+def _view_positions(store, farmers_df, province=None, insurance=None, search=None):
+    """Sorted positions in ``farmers_df`` (``store.scope(province)``) of the rows matching the filters and search text."""
+    positions = None
+    if province is not None or insurance is not None:
+        positions = store.query_positions(farmers_df, province, insurance)
+    if search:
+        found = search_rows(farmers_df, search)
+        positions = found if positions is None else np.intersect1d(positions, found, assume_unique=True)
+    return positions.astype(np.int32)
+
+
+def summary_by(column, province=None, insurance=None):
+    """Farmers, Farm Size, Premium and Payout per Province, Insurance or Climate Issue."""
+    with span("aggregate"):
+        return get_store().summary_by(column, province=province, insurance=insurance)
+
+
+def farmer_totals(province=None, insurance=None):
+    """Farmers, Farm Size, Premium and Payout totals (a dict) for the given filters."""
+    with span("aggregate"):
+        return get_store().totals(province=province, insurance=insurance)
+
+
+def column_options(column):
+    return get_store().options(column)
+
+
+def get_farmer(farmer_id):
+    """One farmer's record (a Series), including registrations still queued for writing."""
+    farmer = _writer.pending(farmer_id) if _writer is not None else None
+    return farmer if farmer is not None else get_store().get(farmer_id)
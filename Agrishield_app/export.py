@@ -0,0 +1,63 @@
+"""Chunked exports of a farmer view ("Download Filtered Data").
+
+Exports are only built when someone asks for them. Rows are encoded
+``CHUNK_ROWS`` at a time, so building one holds the finished file and a
+chunk, not the whole view rendered as one string besides. The download
+button is handed the finished file as bytes, which stay in memory while
+it is served.
+"""
+import gzip
+import io
+
+CHUNK_ROWS = 50_000
+
+# label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "CSV (gzip)": ("csv.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def iter_csv_chunks(frame, chunk_rows=CHUNK_ROWS):
+    """Yield the frame as UTF-8 CSV bytes, header first, ``chunk_rows`` rows at a time."""
+    yield frame.iloc[:0].to_csv(index=False).encode("utf-8")
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows].to_csv(index=False, header=False).encode("utf-8")
+
+
+def _write_parquet(frame, out, chunk_rows):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.Schema.from_pandas(frame.iloc[:0], preserve_index=False)
+    with pq.ParquetWriter(out, schema) as writer:
+        for start in range(0, len(frame), chunk_rows):
+            chunk = frame.iloc[start:start + chunk_rows]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def write_export(frame, export_format, out, chunk_rows=CHUNK_ROWS):
+    """Write ``frame`` to the binary file object ``out`` in one of EXPORT_FORMATS."""
+    if export_format == "CSV":
+        for chunk in iter_csv_chunks(frame, chunk_rows):
+            out.write(chunk)
+    elif export_format == "CSV (gzip)":
+        with gzip.GzipFile(fileobj=out, mode="wb") as compressed:
+            for chunk in iter_csv_chunks(frame, chunk_rows):
+                compressed.write(chunk)
+    elif export_format == "Parquet":
+        _write_parquet(frame, out, chunk_rows)
+    else:
+        raise ValueError(f"Unknown export format: {export_format!r}")
+
+
+def export_file(frame, export_format):
+    """Build an export and return its bytes."""
+    with io.BytesIO() as out:
+        write_export(frame, export_format, out)
+        return out.getvalue()
+
+
+def export_file_name(export_format, stem="filtered_farmers_data"):
+    return f"{stem}.{EXPORT_FORMATS[export_format][0]}"
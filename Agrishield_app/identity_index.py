@@ -0,0 +1,73 @@
+"""Hash index of registered identities for duplicate checks.
+
+Two keys identify a registration:
+
+- ``email_key()``: the trimmed, lowercased email. One registration per
+  email; a second one is offered as an update of the first.
+- ``identity_key()``: the lowercased name, with runs of whitespace
+  collapsed, plus province. A farmer who re-registers under another email
+  usually keeps both, but two farmers can share them too, so this only
+  flags a likely duplicate for the farmer to confirm.
+
+``IdentityIndex`` maps both keys to the Farmer ID that holds them, so each
+check is a dict lookup instead of a scan of the registry. ``BaseStore``
+builds one from the shared table and keeps it current after its own writes;
+the SQLite backend answers the same questions from its indexes instead.
+"""
+
+
+def email_key(email):
+    return str(email).strip().lower()
+
+
+def identity_key(name, province):
+    return (" ".join(str(name).split()).lower(), str(province).strip())
+
+
+class IdentityIndex:
+    def __init__(self):
+        self.emails = {}  # email key -> Farmer ID
+        self.identities = {}  # identity key -> most recent Farmer ID
+
+    def __len__(self):
+        return len(self.emails)
+
+    @classmethod
+    def from_frame(cls, farmers_df):
+        """Index a farmer table; later rows win where keys repeat."""
+        index = cls()
+        farmers_df = farmers_df.dropna(subset=["Farmer ID", "Email"])
+        # Plain lists: building dicts from them is several times faster than from Series
+        ids = farmers_df["Farmer ID"].tolist()
+        emails = farmers_df["Email"].str.strip().str.lower().tolist()
+        names = farmers_df["Name"].str.replace(r"\s+", " ", regex=True).str.strip().str.lower().tolist()
+        provinces = farmers_df["Province"].astype(object).tolist()
+        index.emails = dict(zip(emails, ids))
+        index.identities = dict(zip(zip(names, provinces), ids))
+        return index
+
+    def add(self, records, replaced=None):
+        """Index records just written. ``replaced`` is the previous version of an updated record."""
+        if replaced is not None:
+            for key, keys in [(email_key(replaced["Email"]), self.emails),
+                              (identity_key(replaced["Name"], replaced["Province"]), self.identities)]:
+                if keys.get(key) == replaced["Farmer ID"]:
+                    del keys[key]
+        for record in records:
+            self.emails[email_key(record["Email"])] = record["Farmer ID"]
+            self.identities[identity_key(record["Name"], record["Province"])] = record["Farmer ID"]
+
+    def merge(self, other):
+        """Add the keys of ``other``, an index of newly written rows."""
+        self.emails.update(other.emails)
+        self.identities.update(other.identities)
+
+    def find_email(self, email):
+        return self.emails.get(email_key(email))
+
+    def find_identity(self, name, province):
+        return self.identities.get(identity_key(name, province))
+
+    def taken_emails(self, emails):
+        """The email keys among ``emails`` that are already registered."""
+        return {key for key in map(email_key, emails) if key in self.emails}
@@ -0,0 +1,138 @@
+"""Offline maintenance commands for the Agrishield registry.
+
+Usage (from the Agrishield_app folder):
+    python manage.py compact
+    python manage.py migrate-sqlite
+    python manage.py partition
+    python manage.py import cooperative.xlsx [--dry-run] [--errors errors.csv]
+    python manage.py simulate [--trials 100000] [--workers 4] [--seed 0]
+    python manage.py quote applicants.csv [-o quotes.csv]
+
+``import`` writes to, and ``simulate`` reads from, the backend selected by
+AGRISHIELD_STORAGE. ``quote`` does not touch the registry.
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+import config
+from data_store import CsvStore
+
+
+def cmd_compact(args):
+    rows_before, rows_after = CsvStore(args.csv).compact()
+    print(f"Compacted {args.csv}: {rows_before} rows -> {rows_after} rows")
+
+
+def cmd_migrate_sqlite(args):
+    from sqlite_store import migrate_csv
+
+    rows_read, rows_inserted = migrate_csv(args.csv, args.db)
+    print(f"Migrated {rows_inserted} of {rows_read} rows from {args.csv} into {args.db}")
+    if rows_inserted < rows_read:
+        print(f"Skipped {rows_read - rows_inserted} rows with an email already in the database")
+
+
+def cmd_partition(args):
+    from partitioned_store import partition_csv
+
+    rows_read, rows_written = partition_csv(args.csv, args.partitions)
+    print(f"Copied {rows_written} of {rows_read} rows from {args.csv} into {args.partitions}")
+    if rows_written < rows_read:
+        print(f"Skipped {rows_read - rows_written} rows with an email already in the partitions")
+
+
+def cmd_import(args):
+    from bulk_import import ImportFileError, read_table, validate
+    from data_store import append_farmers
+
+    try:
+        raw_df = read_table(args.file, os.path.basename(args.file))
+        valid_df, errors_df = validate(raw_df)
+    except ImportFileError as exc:
+        raise SystemExit(f"{args.file}: {exc}")
+
+    print(f"{len(raw_df)} rows read, {len(valid_df)} valid, {len(raw_df) - len(valid_df)} with errors")
+    if not errors_df.empty:
+        if args.errors:
+            errors_df.to_csv(args.errors, index=False)
+            print(f"Error report written to {args.errors}")
+        else:
+            print(errors_df.to_string(index=False))
+    if not args.dry_run and not valid_df.empty:
+        print(f"Imported {append_farmers(valid_df)} farmers")
+
+
+def cmd_simulate(args):
+    from data_store import load_farmers
+    from simulation import simulate_portfolio
+
+    summary, losses, exposure_df = simulate_portfolio(
+        load_farmers(), trials=args.trials, seed=args.seed, workers=args.workers
+    )
+    print(exposure_df.to_string(index=False))
+    print()
+    for name, value in summary.items():
+        print(f"{name:>28}: {value:,.2f}")
+    if args.losses:
+        pd.DataFrame({"Loss": losses}).to_csv(args.losses, index=False)
+        print(f"Simulated losses written to {args.losses}")
+
+
+def cmd_quote(args):
+    from quoting import QuoteInputError, quote_paths
+
+    try:
+        rows, errors = quote_paths(args.file, args.output, args.input_format, args.output_format)
+    except (OSError, QuoteInputError) as exc:
+        raise SystemExit(f"{args.file}: {exc}")
+    if args.output != "-":
+        print(f"Quoted {rows - errors} of {rows} applicants into {args.output}")
+    if errors:
+        print(f"{errors} applicants could not be priced; see the Error column", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Agrishield registry maintenance")
+    parser.add_argument("--csv", default=config.CSV_FILE, help="registry CSV file")
+    parser.add_argument("--db", default=config.SQLITE_FILE, help="SQLite database file")
+    parser.add_argument("--partitions", default=config.PARTITION_DIR, help="folder of per-province CSV files")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    compact = commands.add_parser("compact", help="rewrite and normalize the registry CSV")
+    compact.set_defaults(func=cmd_compact)
+
+    migrate = commands.add_parser("migrate-sqlite", help="copy the registry CSV into the SQLite database")
+    migrate.set_defaults(func=cmd_migrate_sqlite)
+
+    partition = commands.add_parser("partition", help="copy the registry CSV into one CSV per province")
+    partition.set_defaults(func=cmd_partition)
+
+    bulk_import = commands.add_parser("import", help="validate and import farmers from a CSV or Excel file")
+    bulk_import.add_argument("file", help="CSV or .xlsx spreadsheet with one farmer per row")
+    bulk_import.add_argument("--dry-run", action="store_true", help="validate only, do not write")
+    bulk_import.add_argument("--errors", help="write the per-row error report to this CSV file")
+    bulk_import.set_defaults(func=cmd_import)
+
+    simulate = commands.add_parser("simulate", help="Monte Carlo simulation of seasonal portfolio losses")
+    simulate.add_argument("--trials", type=int, default=100_000, help="number of simulated seasons")
+    simulate.add_argument("--seed", type=int, default=0)
+    simulate.add_argument("--workers", type=int, default=None, help="worker processes (default: all CPUs)")
+    simulate.add_argument("--losses", help="write every simulated season loss to this CSV file")
+    simulate.set_defaults(func=cmd_simulate)
+
+    quote = commands.add_parser("quote", help="price a CSV/JSONL file of farmer profiles (no registry access)")
+    quote.add_argument("file", help="applicant file with Insurance, Climate Issue and Farm Size columns, or - for stdin")
+    quote.add_argument("-o", "--output", default="-", help="quotes file (.csv or .jsonl), or - for stdout (default)")
+    quote.add_argument("--input-format", choices=["csv", "jsonl"], help="default: from the file extension, else csv")
+    quote.add_argument("--output-format", choices=["csv", "jsonl"], help="default: from the file extension, else input format")
+    quote.set_defaults(func=cmd_quote)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
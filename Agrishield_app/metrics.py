@@ -0,0 +1,287 @@
+"""Lightweight timing spans for page reruns, exported in Prometheus text format.
+
+Pages (and their fragments) name themselves once per rerun with
+``set_page("dashboard")`` and wrap the stages worth watching::
+
+    with span("pricing") as measured:
+        pricing_df = price_frame(filtered_df)
+        measured.rows = len(pricing_df)
+
+or decorate a function with ``@timed("pricing", rows=len)``. For every
+(page, stage) the process keeps a latency histogram plus totals of rows and
+payload bytes. ``snapshot()`` feeds the Ops Metrics page.
+
+Once the app calls ``start_exporter()`` (each page does, after
+``set_page()``), the same numbers are written in Prometheus text format
+every few seconds and, if config.METRICS_PORT is set, served at
+http://127.0.0.1:PORT/metrics. Every app process writes its own file,
+config.METRICS_FILE with the PID before the extension (metrics.4242.prom),
+and labels its series with ``pid``, so node_exporter's textfile collector
+or any local scraper can add them up. The CLI and benchmarks time stages
+the same way but export nothing.
+"""
+import atexit
+import contextvars
+import functools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import config
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+EXPORT_INTERVAL = 5.0  # seconds between metrics file rewrites
+
+_page = contextvars.ContextVar("agrishield_page", default="")
+_lock = threading.Lock()
+_stages = {}  # (page, stage) -> StageStats
+_exporter_started = False
+
+
+class StageStats:
+    """Latency histogram and row/payload totals for one (page, stage)."""
+
+    __slots__ = ("buckets", "count", "seconds", "max_seconds", "rows", "last_rows", "payload_bytes")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.count = 0
+        self.seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.last_rows = None
+        self.payload_bytes = 0
+
+    def observe(self, seconds, rows=None, payload_bytes=None):
+        slot = next((i for i, bound in enumerate(BUCKETS) if seconds <= bound), len(BUCKETS))
+        self.buckets[slot] += 1
+        self.count += 1
+        self.seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if rows is not None:
+            self.rows += rows
+            self.last_rows = rows
+        if payload_bytes is not None:
+            self.payload_bytes += payload_bytes
+
+    def quantile(self, q):
+        """Estimate of the q-quantile, interpolated within histogram buckets."""
+        if not self.count:
+            return math.nan
+        target = q * self.count
+        seen = 0
+        for slot, count in enumerate(self.buckets):
+            if count and seen + count >= target:
+                lower = BUCKETS[slot - 1] if slot else 0.0
+                upper = BUCKETS[slot] if slot < len(BUCKETS) else self.max_seconds
+                return min(lower + (upper - lower) * (target - seen) / count, self.max_seconds)
+            seen += count
+        return self.max_seconds
+
+
+class Measured:
+    """Yielded by ``span()`` so the block can report rows/payload once known."""
+
+    __slots__ = ("rows", "payload_bytes")
+
+    def __init__(self, rows=None, payload_bytes=None):
+        self.rows = rows
+        self.payload_bytes = payload_bytes
+
+
+def set_page(page):
+    """Label every span recorded for the rest of this rerun with ``page``.
+
+    Pages call it first thing, and so does each ``st.fragment``: a fragment
+    rerun runs on a fresh thread, where the label would otherwise be empty.
+    """
+    _page.set(page)
+
+
+@contextmanager
+def span(stage, rows=None, payload_bytes=None):
+    """Time the block as ``stage`` of the current page."""
+    measured = Measured(rows, payload_bytes)
+    start = time.perf_counter()
+    try:
+        yield measured
+    finally:
+        observe(stage, time.perf_counter() - start, measured.rows, measured.payload_bytes)
+
+
+def timed(stage, rows=None):
+    """Decorator form of ``span()``; ``rows`` is an optional callable applied to the result."""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(stage) as measured:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    measured.rows = rows(result)
+                return result
+        return wrapper
+    return decorate
+
+
+@contextmanager
+def figure_span(fig, stage="plotly"):
+    """Time rendering a Plotly figure (or its JSON), recording its JSON payload size."""
+    with span(stage, payload_bytes=len(fig if isinstance(fig, str) else fig.to_json())) as measured:
+        yield measured
+
+
+def observe(stage, seconds, rows=None, payload_bytes=None):
+    key = (_page.get(), stage)
+    with _lock:
+        stats = _stages.get(key)
+        if stats is None:
+            stats = _stages[key] = StageStats()
+        stats.observe(seconds, rows, payload_bytes)
+
+
+def snapshot():
+    """One row per (page, stage) with call counts, latency estimates and totals."""
+    with _lock:
+        rows = [
+            {
+                "Page": page or "(none)",
+                "Stage": stage,
+                "Calls": stats.count,
+                "Mean ms": 1000 * stats.seconds / stats.count,
+                "p50 ms": 1000 * stats.quantile(0.5),
+                "p95 ms": 1000 * stats.quantile(0.95),
+                "Max ms": 1000 * stats.max_seconds,
+                "Total s": stats.seconds,
+                "Last Rows": stats.last_rows,
+                "Payload KB": stats.payload_bytes / 1024,
+            }
+            for (page, stage), stats in sorted(_stages.items())
+        ]
+    return pd.DataFrame(rows, columns=[
+        "Page", "Stage", "Calls", "Mean ms", "p50 ms", "p95 ms", "Max ms", "Total s", "Last Rows", "Payload KB",
+    ]).astype({"Last Rows": "Int64"})
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """All recorded metrics in the Prometheus text exposition format."""
+    with _lock:
+        items = [(page, stage, stats.buckets[:], stats.count, stats.seconds, stats.rows, stats.payload_bytes)
+                 for (page, stage), stats in sorted(_stages.items())]
+
+    pid = os.getpid()
+    lines = [
+        "# HELP agrishield_stage_seconds Time spent in an instrumented page stage.",
+        "# TYPE agrishield_stage_seconds histogram",
+    ]
+    for page, stage, buckets, count, seconds, _, _ in items:
+        labels = f'pid="{pid}",page="{_label(page)}",stage="{_label(stage)}"'
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS + ("+Inf",), buckets):
+            cumulative += bucket_count
+            lines.append(f'agrishield_stage_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f"agrishield_stage_seconds_sum{{{labels}}} {seconds:.6f}")
+        lines.append(f"agrishield_stage_seconds_count{{{labels}}} {count}")
+
+    lines += [
+        "# HELP agrishield_stage_rows_total Rows processed by an instrumented page stage.",
+        "# TYPE agrishield_stage_rows_total counter",
+    ]
+    lines += [f'agrishield_stage_rows_total{{pid="{pid}",page="{_label(page)}",stage="{_label(stage)}"}} {rows}'
+              for page, stage, _, _, _, rows, _ in items]
+    lines += [
+        "# HELP agrishield_stage_payload_bytes_total Bytes of chart/table payload produced by a page stage.",
+        "# TYPE agrishield_stage_payload_bytes_total counter",
+    ]
+    lines += [f'agrishield_stage_payload_bytes_total{{pid="{pid}",page="{_label(page)}",stage="{_label(stage)}"}} {payload}'
+              for page, stage, _, _, _, _, payload in items]
+    return "\n".join(lines) + "\n"
+
+
+def metrics_file():
+    """This process's metrics file: config.METRICS_FILE with the PID before the extension."""
+    if not config.METRICS_FILE:
+        return ""
+    root, extension = os.path.splitext(config.METRICS_FILE)
+    return f"{root}.{os.getpid()}{extension}"
+
+
+def write_metrics_file(path=None):
+    """Atomically (re)write the Prometheus text file."""
+    path = path or metrics_file()
+    if not path:
+        return
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as handle:
+        handle.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = prometheus_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _write_quietly():
+    try:
+        write_metrics_file()
+    except OSError:
+        pass  # a read-only or vanished folder must never break the app
+
+
+def _remove_quietly():
+    # A stopped process's counters must not be scraped forever
+    try:
+        os.remove(metrics_file())
+    except OSError:
+        pass
+
+
+def _export_loop():
+    while True:
+        time.sleep(EXPORT_INTERVAL)
+        _write_quietly()
+
+
+def start_exporter():
+    """Start this process's file writer (and HTTP endpoint, if configured); later calls do nothing."""
+    global _exporter_started
+    if _exporter_started:
+        return
+    with _lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+    if config.METRICS_FILE:
+        threading.Thread(target=_export_loop, name="agrishield-metrics", daemon=True).start()
+        atexit.register(_remove_quietly)
+    if config.METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer(("127.0.0.1", int(config.METRICS_PORT)), _MetricsHandler)
+        except OSError:
+            return  # another app process on this machine already serves the port
+        threading.Thread(target=server.serve_forever, name="agrishield-metrics-http", daemon=True).start()
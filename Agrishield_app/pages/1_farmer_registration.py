@@ -1,10 +1,13 @@
 import streamlit as st
-import pandas as pd
-import os
 
-CSV_FILE = "farmers_data.csv"
+from data_store import DuplicateEmailError, farmer_id_for_email, farmer_id_for_identity, get_farmer, submit_farmer, update_farmer
+from metrics import set_page, start_exporter
+from registration_writer import RegistrationBacklogError
+from schema import CLIMATE_OPTIONS, FIELDS, INSURANCE_OPTIONS, MAX_AGE, MIN_AGE, MIN_FARM_SIZE, PROVINCE_OPTIONS
 
 st.set_page_config(page_title="Agrishield Insurance", page_icon="🌿", layout="wide")
+set_page("registration")
+start_exporter()
 st.markdown(
     """
     <style>
@@ -39,49 +42,100 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# Load existing data if CSV exists
-if os.path.exists(CSV_FILE):
-    farmers_df = pd.read_csv(CSV_FILE)
-else:
-    farmers_df = pd.DataFrame(columns=["Name", "Email", "Age", "Farm Size", "Crop Type", "Insurance", "Climate Issue", "Province"])
-
 # Registration Form
 with st.form("farmer_form"):
     full_name = st.text_input("Full Name", value="")  # Blank field
     email = st.text_input("Email", value="")  # Blank field
-    age = st.number_input("Age", min_value=18, max_value=100, value=None, step=1)  # Now blank
-    farm_size = st.number_input("Farm Size (in acres)", min_value=0.1, step=0.1, value=None)  # Now blank
+    age = st.number_input("Age", min_value=MIN_AGE, max_value=MAX_AGE, value=None, step=1)  # Now blank
+    farm_size = st.number_input("Farm Size (in acres)", min_value=MIN_FARM_SIZE, step=0.1, value=None)  # Now blank
     crop_type = st.text_input("Primary Crop Type", value="")  # Blank field
     
     # Dropdowns with default "Select an option..." value
-    insurance_options = ["Select an option...", "Basic Coverage", "Comprehensive Coverage", "Drought Protection", "Flood Protection"]
+    insurance_options = ["Select an option..."] + INSURANCE_OPTIONS
     insurance_type = st.selectbox("Insurance Type", insurance_options, index=0)
 
-    climate_options = ["Select an option...", "Drought", "Flooding", "Extreme Heat", "Pest Infestation", "Other"]
+    climate_options = ["Select an option..."] + CLIMATE_OPTIONS
     climate_issue = st.selectbox("Climate Issue Faced", climate_options, index=0)
 
-    province_options = ["Select an option...", "Punjab", "Sindh", "Khyber Pakhtunkhwa", "Balochistan", "Gilgit-Baltistan", "Azad Jammu & Kashmir"]
+    province_options = ["Select an option..."] + PROVINCE_OPTIONS
     province = st.selectbox("Province", province_options, index=0)
     
     submit = st.form_submit_button("Register")
 
+
+
+def complete_registration(farmer_id, name, age):
+    st.session_state.farmer_id = farmer_id  # Only this session's farmer ID is kept in session state
+    st.session_state.pop("reregistration", None)
+
+    st.success(f"✅ Registration Successful!\n\n**Name:** {name}\n**Age:** {age} years")
+
+    st.session_state.step = "insurance_payout"  # Move to next step
+
+    # **🔹 Redirect to insurance payout page**
+    st.switch_page("pages/2_insurance_payout.py")
+
+
+def register(new_farmer):
+    try:
+        # Queued; the background writer stores it with the next batch, and the next page reports a failed one
+        farmer_id = submit_farmer(new_farmer)
+    except DuplicateEmailError as exc:
+        # Registered from another session since the check below
+        st.session_state.reregistration = {"farmer_id": exc.farmer_id, "record": new_farmer, "reason": "email"}
+        st.rerun()
+    except RegistrationBacklogError as exc:
+        st.error(f"⚠️ {exc}")
+        st.stop()
+    complete_registration(farmer_id, new_farmer["Name"], new_farmer["Age"])
+
+
 # If farmer submits the form
 if submit:
+    st.session_state.pop("reregistration", None)
     if not full_name or not email or age is None or farm_size is None or not crop_type \
        or insurance_type == "Select an option..." or climate_issue == "Select an option..." or province == "Select an option...":
         st.error("⚠️ Please fill in all required fields before submitting.")
     else:
-        new_farmer = pd.DataFrame([[full_name, email, age, farm_size, crop_type, insurance_type, climate_issue, province]],
-                                  columns=farmers_df.columns)
-        
-        farmers_df = pd.concat([farmers_df, new_farmer], ignore_index=True)  # Append new farmer
-        farmers_df.to_csv(CSV_FILE, index=False)  # Save updated data
-
-        st.session_state.farmers_data = farmers_df.to_dict(orient="records")  # Save to session state
-
-        st.success(f"✅ Registration Successful!\n\n**Name:** {full_name}\n**Age:** {age} years")
-        
-        st.session_state.step = "insurance_payout"  # Move to next step
-        
-        # **🔹 Redirect to insurance payout page**
-        st.switch_page("pages/2_insurance_payout.py")
+        new_farmer = dict(zip(FIELDS, [full_name, email, age, farm_size, crop_type, insurance_type, climate_issue, province]))
+
+        # Hash-index lookups: the same email, or the same name in the same province
+        existing_id = farmer_id_for_email(email)
+        if existing_id is not None:
+            st.session_state.reregistration = {"farmer_id": existing_id, "record": new_farmer, "reason": "email"}
+        else:
+            existing_id = farmer_id_for_identity(full_name, province)
+            if existing_id is None:
+                register(new_farmer)
+            else:
+                st.session_state.reregistration = {"farmer_id": existing_id, "record": new_farmer, "reason": "identity"}
+
+# Already registered: offer to update that registration instead of adding another
+reregistration = st.session_state.get("reregistration")
+if reregistration:
+    new_farmer = reregistration["record"]
+    existing = get_farmer(reregistration["farmer_id"]) if reregistration["farmer_id"] else None
+    if existing is None:
+        st.error("⚠️ This email is already registered.")
+        st.stop()
+
+    if reregistration["reason"] == "email":
+        st.warning(f"⚠️ **{existing['Email']}** is already registered to **{existing['Name']}** "
+                   f"({existing['Province']}). Update that registration with the details above?")
+    else:
+        st.warning(f"⚠️ A farmer named **{existing['Name']}** is already registered in **{existing['Province']}**. "
+                   "Is this the same farmer?")
+
+    col1, col2 = st.columns(2)
+    if col1.button("🔄 Update Existing Registration"):
+        try:
+            farmer_id = update_farmer(reregistration["farmer_id"], new_farmer)
+        except DuplicateEmailError:
+            st.error("⚠️ This email is already registered to another farmer.")
+            st.stop()
+        complete_registration(farmer_id, new_farmer["Name"], new_farmer["Age"])
+    if reregistration["reason"] == "identity" and col2.button("➕ Register as a New Farmer"):
+        register(new_farmer)
+    if reregistration["reason"] == "email" and col2.button("Cancel"):
+        st.session_state.pop("reregistration", None)
+        st.rerun()
@@ -1,7 +1,11 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import os
-import plotly.express as px
+
+from data_store import summary_by
+from metrics import figure_span, set_page, start_exporter
+from pricing import payout_curve, quote
+from ui import registered_farmer
 
 # Page Configuration (Must be first Streamlit command)
 st.set_page_config(
@@ -9,6 +13,8 @@ st.set_page_config(
     page_icon="💰",
     layout="wide"
 )
+set_page("insurance_payout")
+start_exporter()
 
 # Apply custom styling
 st.markdown(
@@ -47,65 +53,49 @@ st.markdown(
 
 st.title("💰 Insurance Payout Estimation")
 
-# Ensure the farmer is registered
-CSV_FILE = "farmers_data.csv"
-if not os.path.exists(CSV_FILE) or pd.read_csv(CSV_FILE).empty:
-    st.warning("⚠️ Kindly register first in order to get further details.")
-    st.stop()
-
-# Load the latest registered farmer
-farmers_df = pd.read_csv(CSV_FILE)
-latest_farmer = farmers_df.iloc[-1]
+# Ensure the farmer is registered (and that a queued registration was stored)
+farmer = registered_farmer()
 
 # Read farmer details
-st.write(f"👤 **Name:** {latest_farmer['Name']}")
-st.write(f"📜 **Insurance Type:** {latest_farmer['Insurance']}")
-st.write(f"☁️ **Climate Issue:** {latest_farmer['Climate Issue']}")
+st.write(f"👤 **Name:** {farmer['Name']}")
+st.write(f"📜 **Insurance Type:** {farmer['Insurance']}")
+st.write(f"☁️ **Climate Issue:** {farmer['Climate Issue']}")
 
-# Payout Calculation
-payout_rate = {
-    "Basic Coverage": 5000,
-    "Comprehensive Coverage": 10000,
-    "Drought Protection": 12000,
-    "Flood Protection": 15000
-}
-base_payout = payout_rate.get(latest_farmer["Insurance"], 5000)
+# Payout Calculation (shared pricing engine)
+estimated_payout = quote(farmer["Insurance"], farmer["Climate Issue"], farmer["Farm Size"])["Payout"]
+st.metric(label="Estimated Payout", value=f"PKR {estimated_payout:,.0f}")
 
-multiplier = {
-    "Drought": 1.2,
-    "Flooding": 1.5,
-    "Extreme Heat": 1.1,
-    "Pest Infestation": 1.3,
-    "Other": 1.0
-}.get(latest_farmer["Climate Issue"], 1.0)
+# Charts (lazy tabs, see ui.py)
+@st.fragment
+def payout_charts(insurance, climate_issue):
+    set_page("insurance_payout")
+    import charts
 
-estimated_payout = base_payout * latest_farmer["Farm Size"] * multiplier
-st.metric(label="Estimated Payout", value=f"PKR {estimated_payout:,.0f}")
+    trend_tab, distribution_tab = st.tabs(
+        ["📈 Payout Trend", "🟡 Payout Distribution"], key="payout_chart_tab", on_change="rerun"
+    )
 
-# 🔵 **Payout Increase Trend (Gradient Area Chart)**
-payout_df = pd.DataFrame({
-    "Farm Size (Acres)": range(1, 51),
-    "Payout (PKR)": [base_payout * size * multiplier for size in range(1, 51)]
-})
+    # 🔵 **Payout Increase Trend (Gradient Area Chart)**
+    if trend_tab.open:
+        farm_sizes = np.arange(1, 51)
+        payout_df = pd.DataFrame({
+            "Farm Size (Acres)": farm_sizes,
+            "Payout (PKR)": payout_curve(insurance, climate_issue, farm_sizes)
+        })
+        fig_payout = charts.payout_trend(payout_df)
+        with trend_tab, figure_span(fig_payout):
+            st.plotly_chart(fig_payout)
 
-fig_payout = px.area(
-    payout_df, x="Farm Size (Acres)", y="Payout (PKR)", 
-    title="📈 Estimated Payout Increase by Farm Size",
-    color_discrete_sequence=["#1f77b4"]
-)
-fig_payout.update_traces(fill='tozeroy', line=dict(width=2))
-st.plotly_chart(fig_payout)
+    # 🟠 **Payout Distribution (Animated Donut Chart)**
+    if distribution_tab.open:
+        payout_distribution = summary_by("Insurance")[["Insurance", "Farmers"]]
+        payout_distribution.columns = ["Insurance Type", "Count"]
+        fig_donut = charts.payout_donut(payout_distribution)
+        with distribution_tab, figure_span(fig_donut):
+            st.plotly_chart(fig_donut)
 
-# 🟠 **Payout Distribution (Animated Donut Chart)**
-payout_distribution = farmers_df["Insurance"].value_counts().reset_index()
-payout_distribution.columns = ["Insurance Type", "Count"]
 
-fig_donut = px.pie(
-    payout_distribution, names="Insurance Type", values="Count",
-    title="🟡 Payout Distribution by Insurance Type",
-    hole=0.5, color_discrete_sequence=px.colors.sequential.Viridis
-)
-st.plotly_chart(fig_donut)
+payout_charts(farmer["Insurance"], farmer["Climate Issue"])
 
 # Proceed Button
 if st.button("➡ Proceed to Premium Charges"):
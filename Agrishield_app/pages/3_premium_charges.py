@@ -1,8 +1,15 @@
 import streamlit as st
 import pandas as pd
-import os
-import plotly.graph_objects as go
-import plotly.express as px
+
+from data_store import data_version, farmer_totals, load_farmers, summary_by
+from metrics import figure_span, set_page, span, start_exporter
+from pricing import premium_rate
+from simulation import simulate_portfolio
+from ui import live_refresh, registered_farmer
+from views import histogram_bins
+
+set_page("premium_charges")
+start_exporter()
 
 # Sidebar and Page Styling
 st.markdown(
@@ -25,97 +32,125 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-CSV_FILE = "farmers_data.csv"
 st.title("💳 Agrishield Premium Charges")
 
-# Ensure the farmer is registered
-if not os.path.exists(CSV_FILE) or pd.read_csv(CSV_FILE).empty:
-    st.warning("⚠️ Kindly register first in order to get further details.")
-    st.stop()
+# Ensure the farmer is registered (and that a queued registration was stored)
+farmer = registered_farmer()
+
+# Live refresh: reruns the page when registrations arrive
+live_refresh("premium_charges", data_version())
 
 # Load data
-farmers_df = pd.read_csv(CSV_FILE)
-latest_farmer = farmers_df.iloc[-1]
+insurance_summary = summary_by("Insurance")
 
 # Read farmer details
-st.write(f"👤 **Name:** {latest_farmer['Name']}")
-st.write(f"📍 **Province:** {latest_farmer['Province']}")
-st.write(f"🌾 **Farm Size:** {latest_farmer['Farm Size']} acres")
-st.write(f"📜 **Insurance Type:** {latest_farmer['Insurance']}")
-
-# Premium Calculation
-premium_rates = {
-    "Basic Coverage": 1000,
-    "Comprehensive Coverage": 2500,
-    "Drought Protection": 3000,
-    "Flood Protection": 3500
-}
-base_premium = premium_rates.get(latest_farmer["Insurance"], 1000)
-annual_premium = base_premium * latest_farmer["Farm Size"]
+st.write(f"👤 **Name:** {farmer['Name']}")
+st.write(f"📍 **Province:** {farmer['Province']}")
+st.write(f"🌾 **Farm Size:** {farmer['Farm Size']} acres")
+st.write(f"📜 **Insurance Type:** {farmer['Insurance']}")
+
+# Premium Calculation (shared pricing engine)
+base_premium = premium_rate(farmer["Insurance"])
+annual_premium = base_premium * farmer["Farm Size"]
 st.metric(label="Annual Premium", value=f"PKR {annual_premium:,.0f}")
 
-# Performance Indicators
-total_farmers = len(farmers_df)
-total_farm_area = farmers_df["Farm Size"].sum()
-total_premium_collected = (farmers_df["Farm Size"] * farmers_df["Insurance"].map(premium_rates)).sum()
+# Performance Indicators (read from the aggregate cube, not the rows)
+totals = farmer_totals()
 
 col1, col2, col3 = st.columns(3)
-col1.metric(label="👨‍🌾 Total Farmers Registered", value=total_farmers)
-col2.metric(label="🌍 Total Insured Farm Area (acres)", value=f"{total_farm_area:,.0f}")
-col3.metric(label="💰 Total Premium Collected (PKR)", value=f"{total_premium_collected:,.0f}")
-
-# 📊 **Stacked Area Chart: Premium & Farm Size by Province**
-province_data = farmers_df.groupby("Province").agg({"Farm Size": "sum"}).reset_index()
-province_data["Total Premium"] = province_data["Farm Size"] * base_premium
-
-if not province_data.empty:
-    stacked_area_fig = go.Figure()
-
-    stacked_area_fig.add_trace(go.Scatter(
-        x=province_data["Province"],
-        y=province_data["Farm Size"],
-        fill='tozeroy',
-        mode='none',
-        name="Farm Size (acres)",
-        line=dict(color="#FF5733")
-    ))
-
-    stacked_area_fig.add_trace(go.Scatter(
-        x=province_data["Province"],
-        y=province_data["Total Premium"],
-        fill='tonexty',
-        mode='none',
-        name="Total Premium",
-        line=dict(color="#1E90FF")
-    ))
-
-    stacked_area_fig.update_layout(
-        title="📊 Stacked Area Chart - Premium & Farm Size by Province",
-        xaxis_title="Province",
-        yaxis_title="Value",
-        paper_bgcolor="#FFFFFF",
-        plot_bgcolor="#FFFFFF",
-        font=dict(color="black"),
-        showlegend=True
+col1.metric(label="👨‍🌾 Total Farmers Registered", value=totals["Farmers"])
+col2.metric(label="🌍 Total Insured Farm Area (acres)", value=f"{totals['Farm Size']:,.0f}")
+col3.metric(label="💰 Total Premium Collected (PKR)", value=f"{totals['Premium']:,.0f}")
+
+# Charts (lazy tabs, see ui.py)
+@st.fragment
+def premium_charts(base_premium, insurance_summary):
+    set_page("premium_charges")
+    import charts
+
+    province_tab, insurance_tab = st.tabs(
+        ["📊 Premium by Province", "🥧 Insurance Types"], key="premium_chart_tab", on_change="rerun"
+    )
+
+    # 📊 **Stacked Area Chart: Premium & Farm Size by Province**
+    if province_tab.open:
+        province_data = summary_by("Province")[["Province", "Farm Size"]]
+        province_data["Total Premium"] = province_data["Farm Size"] * base_premium
+        if not province_data.empty:
+            stacked_area_fig = charts.premium_by_province(province_data)
+            with province_tab, figure_span(stacked_area_fig):
+                st.plotly_chart(stacked_area_fig)
+
+    # 🥧 **Pie Chart: Insurance Type Distribution**
+    if insurance_tab.open:
+        insurance_counts = insurance_summary[["Insurance", "Farmers"]]
+        insurance_counts.columns = ["Insurance Type", "Count"]
+        pie_fig = charts.insurance_pie(insurance_counts)
+        with insurance_tab, figure_span(pie_fig):
+            st.plotly_chart(pie_fig)
+
+
+premium_charts(base_premium, insurance_summary)
+
+
+# 🔢 **Interactive Slider for Custom Calculation** (a fragment, so dragging it
+# reruns only the slider and its metric)
+@st.fragment
+def premium_calculator(base_premium, farm_size):
+    set_page("premium_charges")
+    st.write("### 🔢 Adjust Farm Size to See Premium Changes")
+    custom_farm_size = st.slider("Farm Size (acres)", min_value=0.5, max_value=50.0, step=0.5, value=farm_size)
+    custom_premium = base_premium * custom_farm_size
+    st.metric(label="Updated Premium", value=f"PKR {custom_premium:,.0f}")
+
+
+premium_calculator(base_premium, farmer["Farm Size"])
+
+# 🎲 **Portfolio Exposure Simulation** (a fragment that only runs when asked to)
+@st.fragment
+def exposure_simulation():
+    set_page("premium_charges")
+    st.write("### 🎲 Portfolio Exposure Simulation")
+    st.caption(
+        "Simulates correlated seasonal climate events per province (for example a Sindh flood and a "
+        "Balochistan drought in the same season) and the payouts they would trigger across the whole book."
     )
-    st.plotly_chart(stacked_area_fig)
-
-# 🥧 **Pie Chart: Insurance Type Distribution**
-insurance_counts = farmers_df["Insurance"].value_counts().reset_index()
-insurance_counts.columns = ["Insurance Type", "Count"]
-
-pie_fig = px.pie(insurance_counts, names="Insurance Type", values="Count",
-                 title="📊 Insurance Type Distribution",
-                 color_discrete_sequence=px.colors.qualitative.Set1)
-pie_fig.update_traces(textposition="inside", textinfo="percent+label")
-pie_fig.update_layout(paper_bgcolor="#FFFFFF", font=dict(color="black"))
-st.plotly_chart(pie_fig)
-
-# 🔢 **Interactive Slider for Custom Calculation**
-st.write("### 🔢 Adjust Farm Size to See Premium Changes")
-custom_farm_size = st.slider("Farm Size (acres)", min_value=0.5, max_value=50.0, step=0.5, value=latest_farmer["Farm Size"])
-custom_premium = base_premium * custom_farm_size
-st.metric(label="Updated Premium", value=f"PKR {custom_premium:,.0f}")
+    col1, col2 = st.columns(2)
+    trials = col1.selectbox("Simulated seasons", [10_000, 50_000, 100_000])
+    seed = col2.number_input("Random seed", min_value=0, value=0, step=1)
+    if st.button("🎲 Run Simulation"):
+        with st.spinner("Simulating seasons..."), span("simulation", rows=trials):
+            summary, losses, _ = simulate_portfolio(load_farmers(), trials=trials, seed=int(seed))
+        st.session_state.simulation = {"summary": summary, "bins": histogram_bins(losses, bins=50)}
+
+    result = st.session_state.get("simulation")
+    if result is None:
+        return
+    summary = result["summary"]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric(label="📉 Expected Season Loss (PKR)", value=f"{summary['Expected Loss']:,.0f}")
+    col2.metric(label="⚠️ VaR 99% (PKR)", value=f"{summary['VaR 99%']:,.0f}")
+    col3.metric(label="🔥 TVaR 99% (PKR)", value=f"{summary['TVaR 99%']:,.0f}")
+    col4.metric(label="⚖️ Expected Loss Ratio", value=f"{summary['Expected Loss Ratio']:.0%}")
+    st.write(
+        f"Chance that a season's payouts exceed the premium collected: "
+        f"**{summary['Probability Loss > Premium']:.1%}** ({summary['Trials']:,} simulated seasons)"
+    )
+
+    import charts
+
+    loss_fig = charts.loss_distribution(result["bins"], summary)
+    with figure_span(loss_fig):
+        st.plotly_chart(loss_fig)
+    with st.expander("All risk measures"):
+        st.dataframe(
+            pd.Series(summary, name="Value").rename_axis("Measure").reset_index(),
+            hide_index=True,
+            column_config={"Value": st.column_config.NumberColumn("Value", format="localized")},
+        )
+
+
+exposure_simulation()
 
 # ✅ **Proceed Button**
 if st.button("✅ Complete & View Dashboard"):
@@ -1,7 +1,18 @@
+import json
+from functools import partial
+
 import streamlit as st
-import pandas as pd
-import os
-import plotly.express as px
+
+from data_store import column_options, farmer_totals, filtered_view, has_farmers, summary_by
+from export import EXPORT_FORMATS, export_file, export_file_name
+from metrics import figure_span, set_page, span, start_exporter
+from pricing import price_frame
+from ui import live_refresh
+from view_cache import cached_figure
+from views import box_stats, category_counts, histogram_bins, page_count, paginate
+
+set_page("dashboard")
+start_exporter()
 
 # Apply Styling for a Professional Look
 st.markdown(
@@ -73,113 +84,131 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-CSV_FILE = "farmers_data.csv"
-
 st.title("📊 Farmer Dashboard")
 
-# Check if CSV file exists
-if not os.path.exists(CSV_FILE) or pd.read_csv(CSV_FILE).empty:
+# Check if any farmer has registered
+if not has_farmers():
     st.warning("⚠️ No farmers have registered yet.")
     st.stop()
 
-# Load farmer data
-farmers_df = pd.read_csv(CSV_FILE)
-
 # Filters Section
 st.sidebar.header("🔍 Filters")
 
 # Province Filter
-province_options = ["All"] + list(farmers_df["Province"].unique())
+province_options = ["All"] + column_options("Province")
 selected_province = st.sidebar.selectbox("📍 Select Province", province_options)
 
 # Insurance Type Filter
-insurance_options = ["All"] + list(farmers_df["Insurance"].unique())
+insurance_options = ["All"] + column_options("Insurance")
 selected_insurance = st.sidebar.selectbox("🛡️ Select Insurance Type", insurance_options)
 
-# Apply Filters
-filtered_df = farmers_df.copy()
+province_filter = None if selected_province == "All" else selected_province
+insurance_filter = None if selected_insurance == "All" else selected_insurance
 
-if selected_province != "All":
-    filtered_df = filtered_df[filtered_df["Province"] == selected_province]
-
-if selected_insurance != "All":
-    filtered_df = filtered_df[filtered_df["Insurance"] == selected_insurance]
-
-# Search Feature
+# Search Feature (trigram index) and Filters: each view's rows and charts are cached
+# for every session until the data changes
 search_query = st.text_input("🔍 Search by Name or Email")
-if search_query:
-    filtered_df = filtered_df[
-        filtered_df["Name"].str.contains(search_query, case=False, na=False) |
-        filtered_df["Email"].str.contains(search_query, case=False, na=False)
-    ]
+view_key, filtered_df = filtered_view(province=province_filter, insurance=insurance_filter, search=search_query)
 
-# Display Data
+# Live refresh: reruns the page when registrations arrive
+live_refresh("dashboard", view_key[0], province_filter)
+
+# Display Data (only the visible page is sliced and sent to the browser)
 st.write("### 📄 Filtered Farmer Data")
-st.dataframe(filtered_df.style.set_properties(**{"background-color": "#FFFFFF", "color": "black"}))
+table_col1, table_col2, table_col3, table_col4 = st.columns(4)
+sort_column = table_col1.selectbox("↕️ Sort by", ["Registration order"] + list(filtered_df.columns))
+sort_order = table_col2.selectbox("Order", ["Ascending", "Descending"])
+page_size = table_col3.selectbox("Rows per page", [25, 50, 100, 250])
+total_pages = page_count(len(filtered_df), page_size)
+page_number = table_col4.number_input("Page", min_value=1, max_value=total_pages, value=1, step=1)
+
+with span("paginate", rows=len(filtered_df)):
+    page_df, page_number, total_pages = paginate(
+        filtered_df,
+        page_number,
+        page_size,
+        sort_by=None if sort_column == "Registration order" else sort_column,
+        ascending=sort_order == "Ascending",
+    )
+with span("table_render", rows=len(page_df)):
+    st.dataframe(
+        page_df,
+        hide_index=True,
+        column_config={
+            "Email": st.column_config.TextColumn("Email"),
+            "Age": st.column_config.NumberColumn("Age", format="%d"),
+            "Farm Size": st.column_config.NumberColumn("Farm Size (acres)", format="%.1f"),
+        },
+    )
+st.caption(f"Showing {len(page_df):,} of {len(filtered_df):,} farmers · page {page_number} of {total_pages}")
 
-# Download Button
+# Download Button (the export is only built, in chunks, when the button is clicked)
+export_format = st.selectbox("📦 Export format", list(EXPORT_FORMATS))
 st.download_button(
-    label="📥 Download Filtered Data (CSV)",
-    data=filtered_df.to_csv(index=False),
-    file_name="filtered_farmers_data.csv",
-    mime="text/csv"
+    label=f"📥 Download Filtered Data ({export_format})",
+    data=partial(export_file, filtered_df, export_format),
+    file_name=export_file_name(export_format),
+    mime=EXPORT_FORMATS[export_format][1],
+    on_click="ignore"
 )
 
-# Summary Statistics
+# Summary Statistics: the aggregate cube answers filter-only views; a text search
+# has to count the matching rows
 st.write("### 📊 Summary Statistics")
 
-col1, col2 = st.columns(2)
-col1.metric(label="👨‍🌾 Total Farmers (After Filters)", value=len(filtered_df))
-col2.metric(label="📏 Avg. Farm Size (acres)", value=f"{filtered_df['Farm Size'].mean():,.2f}" if not filtered_df.empty else "0")
-
-# Graph 1: Pie Chart (Province Distribution)
-if not filtered_df.empty:
-    fig_pie = px.pie(
-        filtered_df,
-        names="Province",
-        title="🗺️ Farmer Distribution by Province",
-        color_discrete_sequence=px.colors.qualitative.Set1
+if search_query:
+    farmer_count, farm_area = len(filtered_df), filtered_df["Farm Size"].sum()
+    province_counts = category_counts(filtered_df["Province"], "Province")
+else:
+    totals = farmer_totals(province=province_filter, insurance=insurance_filter)
+    farmer_count, farm_area = totals["Farmers"], totals["Farm Size"]
+    province_counts = (
+        summary_by("Province", province=province_filter, insurance=insurance_filter)[["Province", "Farmers"]]
+        .rename(columns={"Farmers": "Count"})
     )
-    fig_pie.update_traces(textposition="inside", textinfo="percent+label")
-    fig_pie.update_layout(paper_bgcolor="#F8F9FA", font=dict(color="black"))
-    st.plotly_chart(fig_pie)
 
-# Graph 2: Histogram (Farm Size Distribution)
-if not filtered_df.empty:
-    fig_hist = px.histogram(
-        filtered_df,
-        x="Farm Size",
-        nbins=20,
-        title="📏 Farm Size Distribution",
-        color_discrete_sequence=["#004080"]
-    )
-    fig_hist.update_layout(paper_bgcolor="#F8F9FA", font=dict(color="black"))
-    st.plotly_chart(fig_hist)
-
-# Graph 3: Box Plot (Premium vs Payout)
-if "Insurance" in filtered_df.columns:
-    premium_rates = {
-        "Basic Coverage": 1000,
-        "Comprehensive Coverage": 2500,
-        "Drought Protection": 3000,
-        "Flood Protection": 3500
-    }
-    payout_rates = {
-        "Basic Coverage": 5000,
-        "Comprehensive Coverage": 10000,
-        "Drought Protection": 12000,
-        "Flood Protection": 15000
-    }
-
-    filtered_df["Premium"] = filtered_df["Insurance"].map(premium_rates) * filtered_df["Farm Size"]
-    filtered_df["Payout"] = filtered_df["Insurance"].map(payout_rates) * filtered_df["Farm Size"]
-
-    fig_box = px.box(
-        filtered_df,
-        y=["Premium", "Payout"],
-        title="💰 Premium vs. Payout Analysis",
-        color_discrete_sequence=["#007acc", "#28a745"]
+col1, col2 = st.columns(2)
+col1.metric(label="👨‍🌾 Total Farmers (After Filters)", value=farmer_count)
+col2.metric(label="📏 Avg. Farm Size (acres)", value=f"{farm_area / farmer_count:,.2f}" if farmer_count else "0")
+
+# Charts (lazy tabs, see ui.py) receive server-side aggregates only, so figure size does
+# not grow with the registry. Figures are cached as JSON per view, so a popular view is
+# built once per data version
+@st.fragment
+def dashboard_charts(view_key, filtered_df, province_counts):
+    set_page("dashboard")
+    if filtered_df.empty:
+        return
+    import charts
+
+    province_tab, farm_size_tab, pricing_tab = st.tabs(
+        ["🗺️ Provinces", "📏 Farm Sizes", "💰 Premium vs. Payout"], key="dashboard_chart_tab", on_change="rerun"
     )
-    fig_box.update_layout(paper_bgcolor="#F8F9FA", font=dict(color="black"))
-    st.plotly_chart(fig_box)
 
+    # Graph 1: Pie Chart (Province Distribution)
+    if province_tab.open:
+        fig_pie = cached_figure(view_key, "province_pie", lambda: charts.province_pie(province_counts))
+        with province_tab, figure_span(fig_pie):
+            st.plotly_chart(json.loads(fig_pie))
+
+    # Graph 2: Histogram (Farm Size Distribution)
+    if farm_size_tab.open:
+        fig_hist = cached_figure(
+            view_key, "farm_size_histogram",
+            lambda: charts.farm_size_histogram(histogram_bins(filtered_df["Farm Size"], bins=20)),
+        )
+        with farm_size_tab, figure_span(fig_hist):
+            st.plotly_chart(json.loads(fig_hist))
+
+    # Graph 3: Box Plot (Premium vs Payout, climate-adjusted)
+    if pricing_tab.open:
+        def premium_payout_box():
+            pricing_df = price_frame(filtered_df)
+            return charts.premium_payout_box({column: box_stats(pricing_df[column]) for column in ["Premium", "Payout"]})
+
+        fig_box = cached_figure(view_key, "premium_payout_box", premium_payout_box)
+        with pricing_tab, figure_span(fig_box):
+            st.plotly_chart(json.loads(fig_box))
+
+
+dashboard_charts(view_key, filtered_df, province_counts)
@@ -0,0 +1,68 @@
+import streamlit as st
+
+from bulk_import import ImportFileError, read_table, validate
+from data_store import append_farmers
+from metrics import set_page, start_exporter
+from schema import FIELDS
+
+set_page("bulk_import")
+start_exporter()
+
+# Sidebar and Page Styling
+st.markdown(
+    """
+    <style>
+    body, .main { background-color: #FFFFFF !important; color: black !important; }
+    [data-testid="stSidebar"] { background-color: #004080 !important; }
+    [data-testid="stSidebar"] * { color: white !important; }
+    h1, h2, h3, h4, h5, h6 { color: #004080 !important; }
+    .stButton > button {
+        background-color: #007acc !important;
+        color: white !important;
+        border-radius: 8px !important;
+        padding: 8px 16px !important;
+        font-size: 16px !important;
+    }
+    .stButton > button:hover { background-color: #005f99 !important; }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("📥 Bulk Farmer Import")
+st.write("Upload a cooperative's CSV or Excel sheet with the columns: " + ", ".join(f"**{column}**" for column in FIELDS))
+
+uploaded_file = st.file_uploader("Farmer spreadsheet", type=["csv", "xlsx"])
+if uploaded_file is None:
+    st.stop()
+
+# Validate every row at once
+try:
+    raw_df = read_table(uploaded_file, uploaded_file.name)
+    valid_df, errors_df = validate(raw_df)
+except ImportFileError as exc:
+    st.error(f"⚠️ {exc}")
+    st.stop()
+
+col1, col2, col3 = st.columns(3)
+col1.metric(label="📄 Rows in File", value=len(raw_df))
+col2.metric(label="✅ Valid Rows", value=len(valid_df))
+col3.metric(label="❌ Rows with Errors", value=len(raw_df) - len(valid_df))
+
+if not errors_df.empty:
+    st.warning("⚠️ Some rows have errors and will not be imported. Fix them in the sheet and upload it again.")
+    st.dataframe(errors_df, hide_index=True)
+    st.download_button(
+        label="📥 Download Error Report (CSV)",
+        data=errors_df.to_csv(index=False),
+        file_name="import_errors.csv",
+        mime="text/csv"
+    )
+
+if valid_df.empty:
+    st.stop()
+
+# Commit all valid rows in one batched write
+if st.button(f"✅ Import {len(valid_df)} Valid Farmers"):
+    imported = append_farmers(valid_df)
+    st.success(f"✅ Imported {imported} farmers.")
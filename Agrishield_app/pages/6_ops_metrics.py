@@ -0,0 +1,82 @@
+import hmac
+
+import streamlit as st
+
+import config
+from metrics import metrics_file, prometheus_text, reset, snapshot
+from view_cache import shared_cache
+
+# Sidebar and Page Styling
+st.markdown(
+    """
+    <style>
+    body, .main { background-color: #FFFFFF !important; color: black !important; }
+    [data-testid="stSidebar"] { background-color: #004080 !important; }
+    [data-testid="stSidebar"] * { color: white !important; }
+    h1, h2, h3, h4, h5, h6 { color: #004080 !important; }
+    .stButton > button {
+        background-color: #007acc !important;
+        color: white !important;
+        border-radius: 8px !important;
+        padding: 8px 16px !important;
+        font-size: 16px !important;
+    }
+    .stButton > button:hover { background-color: #005f99 !important; }
+    </style>
+    """,
+    unsafe_allow_html=True
+)
+
+st.title("🛠️ Ops Metrics")
+
+# Admins only: the page stays locked unless AGRISHIELD_ADMIN_TOKEN is set and entered
+if not config.ADMIN_TOKEN:
+    st.info("Ops metrics are disabled. Set AGRISHIELD_ADMIN_TOKEN to enable this page.")
+    st.stop()
+if not st.session_state.get("is_admin"):
+    token = st.text_input("🔑 Admin token", type="password")
+    if not token:
+        st.stop()
+    if not hmac.compare_digest(token.encode(), config.ADMIN_TOKEN.encode()):
+        st.error("⚠️ Invalid admin token.")
+        st.stop()
+    st.session_state.is_admin = True
+
+st.caption("Timings recorded by this app process since it started, per page and stage.")
+metrics_df = snapshot()
+if metrics_df.empty:
+    st.info("No page has been timed yet.")
+    st.stop()
+
+st.dataframe(
+    metrics_df,
+    hide_index=True,
+    column_config={
+        column: st.column_config.NumberColumn(column, format="%.1f")
+        for column in ["Mean ms", "p50 ms", "p95 ms", "Max ms", "Total s", "Payload KB"]
+    },
+)
+
+# Dashboard views and charts shared between sessions (see view_cache.py)
+st.write("### 🗂️ Dashboard View Cache")
+cache_stats = shared_cache().stats()
+cache_col1, cache_col2, cache_col3, cache_col4 = st.columns(4)
+cache_col1.metric("Hit Rate", f"{cache_stats['Hit Rate']:.0%}")
+cache_col2.metric("Hits / Misses", f"{cache_stats['Hits']:,} / {cache_stats['Misses']:,}")
+cache_col3.metric("Memory (MB)", f"{cache_stats['MB']:,.1f} of {cache_stats['Max MB']:,.0f}")
+cache_col4.metric("Entries / Evictions", f"{cache_stats['Entries']:,} / {cache_stats['Evictions']:,}")
+
+# Where rerun time goes: total seconds per stage, stacked by page
+st.write("### ⏱️ Time Spent per Stage")
+st.bar_chart(metrics_df.pivot_table(index="Stage", columns="Page", values="Total s", aggfunc="sum", fill_value=0))
+
+with st.expander("Prometheus text format"):
+    if config.METRICS_FILE:
+        st.write(f"This process writes them every few seconds to `{metrics_file()}`.")
+    if config.METRICS_PORT:
+        st.write(f"Served at `http://127.0.0.1:{config.METRICS_PORT}/metrics`.")
+    st.code(prometheus_text(), language="text")
+
+if st.button("♻️ Reset Metrics"):
+    reset()
+    st.rerun()
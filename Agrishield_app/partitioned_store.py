@@ -0,0 +1,253 @@
+"""Province-partitioned CSV backend (AGRISHIELD_STORAGE=partitioned).
+
+The registry is a folder with one append-only CSV per province and a small
+manifest naming them::
+
+    farmers_by_province/
+        manifest.json    {"format": 1, "partitions": {"Punjab": "punjab.csv", ...}}
+        punjab.csv
+        sindh.csv
+
+Each partition is a CsvStore with its own lock file, version key, cached
+table, email index and aggregate cube. A registration in Sindh therefore neither waits on
+nor invalidates Punjab. A province-filtered query reads only that province's
+file and is versioned by it alone (``scope()`` / ``scope_version()``), and
+``has_farmers()`` and the province list come from the manifest and file
+contents without loading any partition. The full table is the concatenation of the cached partitions, so
+after a write only the partition that changed is read from disk again.
+
+Moving a farmer to another province holds both partitions' locks while the
+row is appended to one file and removed from the other.
+
+Emails stay unique across the whole registry: a write checks every
+partition's email index (one dict lookup each). Only the target partition
+is locked, though, so two processes registering the same email in two
+provinces at the same instant could both succeed.
+"""
+import json
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from cube import AggregateCube
+from data_store import BaseStore, CsvStore, DuplicateEmailError, new_farmer_id, with_farmer_ids
+from schema import COLUMNS, apply_schema, conform_frame, conform_record
+
+try:
+    import fcntl
+except ImportError:  # Windows: manifest updates are only serialized in-process
+    fcntl = None
+
+MANIFEST = "manifest.json"
+MANIFEST_FORMAT = 1
+
+
+def partition_file_name(province):
+    """"Azad Jammu & Kashmir" -> "azad_jammu_kashmir.csv"."""
+    return re.sub(r"[^a-z0-9]+", "_", province.lower()).strip("_") + ".csv"
+
+
+class PartitionedStore(BaseStore):
+    def __init__(self, root):
+        super().__init__()
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST)
+        self._manifest_lock = threading.Lock()
+        self._manifest_mtime = None
+        self._partitions = {}  # Province -> CsvStore, in manifest order
+        os.makedirs(root, exist_ok=True)
+        self._refresh_manifest()
+
+    def _refresh_manifest(self):
+        """Re-read the manifest if another process changed it."""
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime == self._manifest_mtime:
+            return
+        files = self._read_manifest()
+        partitions = dict(self._partitions)
+        for province, file_name in files.items():
+            if province not in partitions:
+                partitions[province] = CsvStore(os.path.join(self.root, file_name))
+        self._partitions, self._manifest_mtime = partitions, mtime
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except FileNotFoundError:
+            return {}
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ValueError(f"{self.manifest_path}: unsupported manifest format {manifest.get('format')!r}")
+        return manifest["partitions"]
+
+    @contextmanager
+    def _manifest_exclusive(self):
+        with self._manifest_lock, open(self.manifest_path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def partition(self, province, create=False):
+        """The CsvStore holding ``province``'s farmers, or None if it has none yet (unless ``create``)."""
+        self._refresh_manifest()
+        partition = self._partitions.get(province)
+        if partition is not None or not create:
+            return partition
+        with self._manifest_exclusive():
+            files = self._read_manifest()
+            if province not in files:
+                files[province] = partition_file_name(province)
+                tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as handle:
+                    json.dump({"format": MANIFEST_FORMAT, "partitions": files}, handle, indent=2)
+                os.replace(tmp_path, self.manifest_path)
+            self._refresh_manifest()
+        return self._partitions[province]
+
+    def provinces(self):
+        self._refresh_manifest()
+        return list(self._partitions)
+
+    def _all_partitions(self):
+        self._refresh_manifest()
+        return list(self._partitions.values())
+
+    def _named_partitions(self):
+        self._refresh_manifest()
+        return list(self._partitions.items())
+
+    def version(self):
+        self._refresh_manifest()
+        return tuple((province, partition.version()) for province, partition in self._partitions.items())
+
+    def _read_all(self):
+        frames = [partition.load() for partition in self._partitions.values()]
+        if not frames:
+            return apply_schema(pd.DataFrame(columns=COLUMNS))
+        # Partitions may have different crop categories, so restore the dtypes after stacking
+        return apply_schema(pd.concat(frames, ignore_index=True))
+
+    def has_farmers(self):
+        """True if any province file has a row, checked from the manifest and files without loading them."""
+        return any(partition.has_farmers() for partition in self._all_partitions())
+
+    def scope_version(self, province=None):
+        if province is None:
+            return self.version()
+        partition = self.partition(province)
+        return partition.version() if partition is not None else None
+
+    def scope(self, province=None):
+        """(version, table) of ``province``'s partition only, or of the whole registry."""
+        if province is None:
+            return self.load_versioned()
+        partition = self.partition(province)
+        if partition is None:
+            return (None, apply_schema(pd.DataFrame(columns=COLUMNS)))
+        return partition.load_versioned()
+
+    def options(self, column):
+        if column == "Province":
+            return sorted(province for province, partition in self._named_partitions() if partition.has_farmers())
+        return super().options(column)
+
+    def _read_cube(self):
+        return AggregateCube.combine(partition.cube() for partition in self._all_partitions())
+
+    def _cube_for(self, province):
+        """The whole cube, or only ``province``'s partition's cube when filtering by province."""
+        if province is None:
+            return self.cube()
+        partition = self.partition(province)
+        return partition.cube() if partition is not None else AggregateCube.combine([])
+
+    def summary_by(self, column, province=None, insurance=None):
+        return self._cube_for(province).rollup(column, province=province, insurance=insurance)
+
+    def totals(self, province=None, insurance=None):
+        return self._cube_for(province).totals(province=province, insurance=insurance)
+
+    def find_email(self, email):
+        for partition in self._all_partitions():
+            farmer_id = partition.find_email(email)
+            if farmer_id is not None:
+                return farmer_id
+        return None
+
+    def find_identity(self, name, province):
+        partition = self.partition(province)
+        return partition.find_identity(name, province) if partition is not None else None
+
+    def taken_emails(self, emails):
+        emails = list(emails)
+        taken = set()
+        for partition in self._all_partitions():
+            taken |= partition.taken_emails(emails)
+        return taken
+
+    def _check_email(self, record, farmer_id=None):
+        existing_id = self.find_email(record["Email"])
+        if existing_id not in (None, farmer_id):
+            raise DuplicateEmailError(f"{record['Email']} is already registered", existing_id)
+
+    def append(self, record):
+        """Append one registration to its province's file. Returns its Farmer ID."""
+        record = conform_record({**record, "Farmer ID": record.get("Farmer ID") or new_farmer_id()})
+        self._check_email(record)
+        return self.partition(record["Province"], create=True).append(record)
+
+    def append_many(self, farmers_df):
+        """Append rows to their provinces' files, skipping duplicate emails. Returns rows written."""
+        if farmers_df.empty:
+            return 0
+        farmers_df = conform_frame(with_farmer_ids(farmers_df))
+        keys = farmers_df["Email"].str.lower()
+        farmers_df = farmers_df[~keys.duplicated(keep="first") & ~keys.isin(self.taken_emails(keys))]
+        return sum(
+            self.partition(province, create=True).append_many(province_df)
+            for province, province_df in farmers_df.groupby("Province", observed=True, sort=False)
+        )
+
+    def update(self, farmer_id, record):
+        """Replace the registration ``farmer_id``, moving it if the province changed. Returns the Farmer ID."""
+        record = conform_record({**record, "Farmer ID": farmer_id})
+        current = next(
+            (partition for partition in self._all_partitions() if partition.get(farmer_id) is not None), None
+        )
+        if current is None:
+            raise KeyError(farmer_id)
+        self._check_email(record, farmer_id)
+        target = self.partition(record["Province"], create=True)
+        if target is current:
+            return current.update(farmer_id, record)
+        # Hold both partitions' locks (in file order, so two opposite moves cannot deadlock) while the
+        # row moves. It is appended before it is removed: a crash in between leaves it in both files
+        # rather than in neither.
+        first, second = sorted([current, target], key=lambda partition: partition.path)
+        with first._exclusive(), second._exclusive():
+            if current.get(farmer_id) is None:
+                raise KeyError(farmer_id)  # moved or removed while we waited for the locks
+            target._append_locked(record)
+            current._remove_locked(farmer_id)
+        return farmer_id
+
+    def compact(self):
+        """Compact every partition. Returns (rows_before, rows_after) summed over partitions."""
+        totals = [partition.compact() for partition in self._all_partitions()]
+        return (sum(before for before, _ in totals), sum(after for _, after in totals))
+
+
+def partition_csv(csv_path, root):
+    """One-shot copy of a flat registry CSV into per-province files. Returns (rows_read, rows_written)."""
+    farmers_df = CsvStore(csv_path).load()
+    return len(farmers_df), PartitionedStore(root).append_many(farmers_df)
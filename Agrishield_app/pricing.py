@@ -0,0 +1,122 @@
+"""Premium and payout pricing shared by every page.
+
+The rate tables live here only. ``price_frame()`` / ``price_arrays()`` price
+a whole table in one vectorized pass: Insurance and Climate Issue values are
+turned into categorical codes that index NumPy lookup arrays, so repricing a
+large portfolio never touches Python dicts row by row.
+
+Payout is always climate-adjusted: base payout rate x farm size x climate
+multiplier. Unknown insurance types fall back to Basic Coverage rates and
+unknown climate issues to a multiplier of 1.0, as the pages always did.
+"""
+import numpy as np
+import pandas as pd
+
+from metrics import timed
+
+PREMIUM_RATES = {
+    "Basic Coverage": 1000,
+    "Comprehensive Coverage": 2500,
+    "Drought Protection": 3000,
+    "Flood Protection": 3500
+}
+PAYOUT_RATES = {
+    "Basic Coverage": 5000,
+    "Comprehensive Coverage": 10000,
+    "Drought Protection": 12000,
+    "Flood Protection": 15000
+}
+CLIMATE_MULTIPLIERS = {
+    "Drought": 1.2,
+    "Flooding": 1.5,
+    "Extreme Heat": 1.1,
+    "Pest Infestation": 1.3,
+    "Other": 1.0
+}
+
+DEFAULT_PREMIUM_RATE = PREMIUM_RATES["Basic Coverage"]
+DEFAULT_PAYOUT_RATE = PAYOUT_RATES["Basic Coverage"]
+DEFAULT_MULTIPLIER = 1.0
+
+INSURANCE_TYPES = list(PREMIUM_RATES)
+CLIMATE_ISSUES = list(CLIMATE_MULTIPLIERS)
+
+# Lookup arrays indexed by categorical code. Unknown values get code -1,
+# which lands on the trailing default slot.
+PREMIUM_LOOKUP = np.array([*PREMIUM_RATES.values(), DEFAULT_PREMIUM_RATE], dtype=np.float64)
+PAYOUT_LOOKUP = np.array([*(PAYOUT_RATES[name] for name in INSURANCE_TYPES), DEFAULT_PAYOUT_RATE], dtype=np.float64)
+MULTIPLIER_LOOKUP = np.array([*CLIMATE_MULTIPLIERS.values(), DEFAULT_MULTIPLIER], dtype=np.float64)
+
+
+def _codes(values, categories):
+    """Position of each value in ``categories``; -1 for anything else."""
+    values = pd.Series(values, copy=False)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Look up each category once; the appended -1 is where missing values (code -1) land
+        positions = np.append(categories.get_indexer(values.cat.categories), -1)
+        return positions[values.cat.codes.to_numpy()]
+    return categories.get_indexer(values)
+
+
+def insurance_codes(values):
+    return _codes(values, pd.Index(INSURANCE_TYPES))
+
+
+def climate_codes(values):
+    return _codes(values, pd.Index(CLIMATE_ISSUES))
+
+
+def price_arrays(insurance_code, climate_code, farm_size):
+    """Vectorized pricing on code arrays. Returns (premium, base_payout, payout)."""
+    farm_size = np.asarray(farm_size, dtype=np.float64)
+    premium = PREMIUM_LOOKUP[insurance_code] * farm_size
+    base_payout = PAYOUT_LOOKUP[insurance_code] * farm_size
+    payout = base_payout * MULTIPLIER_LOOKUP[climate_code]
+    return premium, base_payout, payout
+
+
+@timed("pricing", rows=len)
+def price_frame(farmers_df):
+    """Price every row of a farmer table; result is aligned to its index."""
+    premium, base_payout, payout = price_arrays(
+        insurance_codes(farmers_df["Insurance"]),
+        climate_codes(farmers_df["Climate Issue"]),
+        farmers_df["Farm Size"].to_numpy(dtype=np.float64),
+    )
+    return pd.DataFrame(
+        {"Premium": premium, "Base Payout": base_payout, "Payout": payout},
+        index=farmers_df.index,
+    )
+
+
+def premium_rates_for(insurance_values):
+    """Per-acre premium for each insurance value (vectorized)."""
+    return PREMIUM_LOOKUP[insurance_codes(insurance_values)]
+
+
+def premium_rate(insurance):
+    return PREMIUM_RATES.get(insurance, DEFAULT_PREMIUM_RATE)
+
+
+def payout_rate(insurance):
+    return PAYOUT_RATES.get(insurance, DEFAULT_PAYOUT_RATE)
+
+
+def climate_multiplier(climate_issue):
+    return CLIMATE_MULTIPLIERS.get(climate_issue, DEFAULT_MULTIPLIER)
+
+
+def quote(insurance, climate_issue, farm_size):
+    """Price a single farmer. Returns a dict with Premium, Base Payout and Payout."""
+    base_payout = payout_rate(insurance) * farm_size
+    return {
+        "Premium": premium_rate(insurance) * farm_size,
+        "Base Payout": base_payout,
+        "Payout": base_payout * climate_multiplier(climate_issue),
+    }
+
+
+def payout_curve(insurance, climate_issue, farm_sizes):
+    """Climate-adjusted payout for each farm size in ``farm_sizes``."""
+    rate = payout_rate(insurance) * climate_multiplier(climate_issue)
+    return rate * np.asarray(farm_sizes, dtype=np.float64)
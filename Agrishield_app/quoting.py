@@ -0,0 +1,127 @@
+"""Headless premium and payout quotes for batches of farmer profiles.
+
+Partner banks send a CSV or JSONL file of applicants with at least the
+Insurance, Climate Issue and Farm Size columns. Any other columns, such as
+their own applicant ID, are passed through. ``quote_frame()`` prices a table
+with the app's rate tables and vectorized pricing (``pricing.price_arrays()``).
+``quote_file()`` streams a file through it ``CHUNK_ROWS`` rows at a time, so
+memory stays flat however many applicants there are. Used by
+``python manage.py quote``.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from pricing import climate_codes, insurance_codes, price_arrays
+from schema import CLIMATE_OPTIONS, INSURANCE_OPTIONS
+
+QUOTE_FIELDS = ["Insurance", "Climate Issue", "Farm Size"]
+CHUNK_ROWS = 50_000
+
+
+class QuoteInputError(ValueError):
+    """The applicant file cannot be read or lacks required columns."""
+
+
+def quote_frame(profiles_df):
+    """Applicant rows plus Premium, Base Payout, Payout and Error columns.
+
+    Headers are matched case-insensitively. Rows with an unknown insurance
+    type or climate issue, or a farm size that is not a positive number, are
+    not priced; their Error column says why. It is empty for priced rows.
+    """
+    headers = {column.lower(): column for column in QUOTE_FIELDS}
+    profiles_df = profiles_df.rename(columns=lambda column: headers.get(str(column).strip().lower(), column))
+    missing = [column for column in QUOTE_FIELDS if column not in profiles_df.columns]
+    if missing:
+        raise QuoteInputError(f"Missing column(s): {', '.join(missing)}")
+
+    errors = pd.Series("", index=profiles_df.index, dtype=object)
+    canonical = {}
+    for column, options in [("Insurance", INSURANCE_OPTIONS), ("Climate Issue", CLIMATE_OPTIONS)]:
+        values = profiles_df[column].astype(str).str.strip().str.lower()
+        canonical[column] = values.map({option.lower(): option for option in options})
+        errors = errors.mask(canonical[column].isna() & (errors == ""), f"{column} must be one of: {', '.join(options)}")
+    farm_size = pd.to_numeric(profiles_df["Farm Size"], errors="coerce")
+    errors = errors.mask((farm_size.isna() | (farm_size <= 0)) & (errors == ""), "Farm Size must be a number greater than 0")
+
+    premium, base_payout, payout = price_arrays(
+        insurance_codes(canonical["Insurance"]),
+        climate_codes(canonical["Climate Issue"]),
+        farm_size.to_numpy(dtype=np.float64),
+    )
+    valid = (errors == "").to_numpy()
+    return profiles_df.assign(
+        **{column: canonical[column].where(valid, profiles_df[column]) for column in canonical},
+        **{
+            "Premium": np.where(valid, premium.round(2), np.nan),
+            "Base Payout": np.where(valid, base_payout.round(2), np.nan),
+            "Payout": np.where(valid, payout.round(2), np.nan),
+            "Error": errors,
+        },
+    )
+
+
+def quote_records(records):
+    """Price a list of profile dicts; returns one dict per profile with the quote columns added."""
+    return quote_frame(pd.DataFrame(list(records))).to_dict(orient="records")
+
+
+def file_format(path, default="csv"):
+    """Format implied by a file name: .jsonl/.ndjson or .csv, else ``default`` (e.g. for "-")."""
+    lowered = str(path).lower()
+    if lowered.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lowered.endswith(".csv"):
+        return "csv"
+    return default
+
+
+def iter_profile_chunks(source, input_format="csv", chunk_rows=CHUNK_ROWS):
+    """Yield the applicant file as DataFrames of at most ``chunk_rows`` rows."""
+    if input_format == "csv":
+        reader = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    elif input_format == "jsonl":
+        reader = pd.read_json(source, lines=True, dtype=False, chunksize=chunk_rows)
+    else:
+        raise QuoteInputError(f"Unknown input format: {input_format!r}")
+    try:
+        yield from reader
+    except ValueError as exc:  # malformed CSV/JSON lines
+        raise QuoteInputError(f"Cannot read the applicant file: {exc}") from exc
+
+
+def write_quotes(quotes_df, out, output_format="csv", header=True):
+    if output_format == "csv":
+        quotes_df.to_csv(out, index=False, header=header)
+    elif output_format == "jsonl":
+        if not quotes_df.empty:
+            out.write(quotes_df.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n") + "\n")
+    else:
+        raise QuoteInputError(f"Unknown output format: {output_format!r}")
+
+
+def quote_file(source, out, input_format="csv", output_format="csv", chunk_rows=CHUNK_ROWS):
+    """Stream applicants from ``source`` to quotes in ``out``. Returns (rows_quoted, rows_with_errors).
+
+    ``source`` is a path or readable file object and ``out`` a writable text file object.
+    """
+    rows = errors = 0
+    for chunk in iter_profile_chunks(source, input_format, chunk_rows):
+        quotes_df = quote_frame(chunk)
+        write_quotes(quotes_df, out, output_format, header=rows == 0)
+        rows += len(quotes_df)
+        errors += int((quotes_df["Error"] != "").sum())
+    return rows, errors
+
+
+def quote_paths(input_path, output_path="-", input_format=None, output_format=None, chunk_rows=CHUNK_ROWS):
+    """``quote_file()`` on file paths, with "-" meaning stdin / stdout and formats guessed from extensions."""
+    input_format = input_format or file_format(input_path)
+    output_format = output_format or file_format(output_path, default=input_format)
+    source = sys.stdin if input_path == "-" else input_path
+    if output_path == "-":
+        return quote_file(source, sys.stdout, input_format, output_format, chunk_rows)
+    with open(output_path, "w", encoding="utf-8", newline="") as out:
+        return quote_file(source, out, input_format, output_format, chunk_rows)
@@ -0,0 +1,208 @@
+"""Buffered background writer for registrations.
+
+The registration page hands each validated record to ``submit()`` and
+returns straight away. A single writer thread drains the queue and stores
+records in batches through the store's ``append_many()`` (one lock, one
+write, one fsync or commit per batch). A batch is written when it reaches
+``batch_rows`` records or ``flush_seconds`` after its first record,
+whichever comes first.
+
+Each ``submit()`` returns a Future that resolves to the Farmer ID once the
+batch holding the record is durably stored, or to the error that stopped
+it. Until then ``pending()`` returns the record, so the next page can show
+it. A batch that fails is retried ``retries`` times, backing off from
+``retry_seconds``; if it still fails, ``failure()`` keeps each record's
+error so the farmer's next page can say the registration was not saved.
+The queue is bounded: when ``max_pending`` records are waiting,
+``submit()`` blocks for up to ``put_timeout`` seconds and then raises
+RegistrationBacklogError. ``close()`` (registered with atexit) writes
+whatever is still queued before the process exits.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, wait
+
+import pandas as pd
+
+from data_store import DuplicateEmailError, new_farmer_id
+from identity_index import email_key
+from metrics import span
+from schema import COLUMNS, conform_record
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class RegistrationBacklogError(RuntimeError):
+    """Too many registrations are waiting to be written; try again shortly."""
+
+
+class RegistrationWriter:
+    def __init__(self, store, batch_rows=200, flush_seconds=0.5, max_pending=5000, put_timeout=5.0,
+                 retries=2, retry_seconds=0.5):
+        self.store = store
+        self.batch_rows = batch_rows
+        self.flush_seconds = flush_seconds
+        self.put_timeout = put_timeout
+        self.retries = retries
+        self.retry_seconds = retry_seconds
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._pending = {}  # Farmer ID -> (record, Future)
+        self._failed = OrderedDict()  # Farmer ID -> error that kept it from being stored, oldest first
+        self._max_failed = max_pending
+        self._pending_emails = {}  # email key -> Farmer ID, for the submit-time duplicate check
+        self._pending_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="agrishield-registration-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, record):
+        """Validate and queue one registration. Returns (farmer_id, Future).
+
+        Raises SchemaError for an invalid record, DuplicateEmailError when the
+        email is already stored or queued, and RegistrationBacklogError when
+        the queue stays full.
+        """
+        record = conform_record({**record, "Farmer ID": record.get("Farmer ID") or new_farmer_id()})
+        key = email_key(record["Email"])
+        existing_id = self.store.find_email(key)
+
+        future = Future()
+        with self._pending_lock:
+            existing_id = self._pending_emails.get(key, existing_id)
+            if existing_id is not None:
+                raise DuplicateEmailError(f"{record['Email']} is already registered", existing_id)
+            queued = not self._closed  # shutting down: write synchronously instead of queueing
+            if queued:
+                self._pending[record["Farmer ID"]] = (record, future)
+                self._pending_emails[key] = record["Farmer ID"]
+        if not queued:
+            self._write([(record, future)])
+            return record["Farmer ID"], future
+
+        try:
+            self._queue.put((record, future), timeout=self.put_timeout)
+        except queue.Full:
+            with self._pending_lock:
+                self._forget(record)
+            raise RegistrationBacklogError("Registrations are busy right now; please try again in a moment.")
+        return record["Farmer ID"], future
+
+    def pending(self, farmer_id):
+        """The queued (not yet stored) record for ``farmer_id`` as a Series, or None."""
+        with self._pending_lock:
+            entry = self._pending.get(farmer_id)
+        return None if entry is None else pd.Series(entry[0])
+
+    def failure(self, farmer_id):
+        """The error that kept ``farmer_id``'s queued registration from being stored, or None."""
+        with self._pending_lock:
+            return self._failed.get(farmer_id)
+
+    def queued_email(self, email):
+        """Farmer ID of the queued registration using ``email``, or None."""
+        with self._pending_lock:
+            return self._pending_emails.get(email_key(email))
+
+    def flush(self, timeout=None):
+        """Wait until everything queued so far is stored. Returns True if it was in time."""
+        with self._pending_lock:
+            futures = [future for _, future in self._pending.values()]
+        return not wait(futures, timeout=timeout).not_done
+
+    def close(self, timeout=30.0):
+        """Stop accepting queued work, write what is left and stop the thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_rows:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+        # Anything queued while stopping
+        leftovers = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftovers.append(item)
+        if leftovers:
+            self._write(leftovers)
+
+    def _write(self, batch):
+        records = [record for record, _ in batch]
+        for attempt in range(self.retries + 1):
+            try:
+                with span("registration_batch", rows=len(records)):
+                    written = self.store.append_many(pd.DataFrame(records, columns=COLUMNS))
+                break
+            except Exception as exc:
+                if attempt == self.retries:
+                    logger.exception("Writing %d queued registrations failed", len(records))
+                    error = exc  # the except clause unbinds exc; the lambda needs its own name
+                    self._settle(batch, lambda record: error)
+                    return
+                logger.warning("Writing %d queued registrations failed (%s); retrying", len(records), exc)
+                time.sleep(self.retry_seconds * 2 ** attempt)
+
+        if written == len(records):
+            self._settle(batch, lambda record: None)
+        else:
+            # The backend skipped duplicate emails (raced past the submit-time check)
+            self._settle(batch, self._duplicate_error)
+
+    def _duplicate_error(self, record):
+        existing_id = self.store.find_email(record["Email"])
+        if existing_id == record["Farmer ID"]:
+            return None
+        return DuplicateEmailError(f"{record['Email']} is already registered", existing_id)
+
+    def _settle(self, batch, error_for):
+        for record, future in batch:
+            error = error_for(record)
+            with self._pending_lock:
+                self._forget(record)
+                if error is not None:
+                    self._failed[record["Farmer ID"]] = error
+                    if len(self._failed) > self._max_failed:
+                        self._failed.popitem(last=False)
+            if error is None:
+                future.set_result(record["Farmer ID"])
+            else:
+                future.set_exception(error)
+
+    def _forget(self, record):
+        """Drop a record from the pending maps; call under ``_pending_lock``."""
+        self._pending.pop(record["Farmer ID"], None)
+        key = email_key(record["Email"])
+        if self._pending_emails.get(key) == record["Farmer ID"]:
+            del self._pending_emails[key]
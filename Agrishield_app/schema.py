@@ -0,0 +1,193 @@
+"""The farmer record: its columns, allowed values and in-memory dtypes.
+
+The registration form, bulk import, pricing and the stores all refer to
+these definitions, so a new province or insurance product only has to be
+added here (and, for insurance or climate issues, given rates in pricing.py).
+
+``apply_schema()`` is applied whenever a store loads rows: Insurance,
+Climate Issue, Province and Crop Type become categoricals, Age int8 and
+Farm Size float32, which keeps a large registry several times smaller than
+inferred object/int64 columns and makes groupby/value_counts work on codes.
+``conform_frame()`` / ``conform_record()`` are applied whenever a store
+writes rows, so nothing outside the schema reaches disk.
+"""
+import importlib.util
+import math
+
+import numpy as np
+import pandas as pd
+
+FIELDS = ["Name", "Email", "Age", "Farm Size", "Crop Type", "Insurance", "Climate Issue", "Province"]
+COLUMNS = ["Farmer ID"] + FIELDS
+
+INSURANCE_OPTIONS = ["Basic Coverage", "Comprehensive Coverage", "Drought Protection", "Flood Protection"]
+CLIMATE_OPTIONS = ["Drought", "Flooding", "Extreme Heat", "Pest Infestation", "Other"]
+PROVINCE_OPTIONS = ["Punjab", "Sindh", "Khyber Pakhtunkhwa", "Balochistan", "Gilgit-Baltistan", "Azad Jammu & Kashmir"]
+
+MIN_AGE = 18
+MAX_AGE = 100
+MIN_FARM_SIZE = 0.1
+
+CATEGORY_OPTIONS = {
+    "Insurance": INSURANCE_OPTIONS,
+    "Climate Issue": CLIMATE_OPTIONS,
+    "Province": PROVINCE_OPTIONS,
+}
+REQUIRED_TEXT_COLUMNS = ["Name", "Email", "Crop Type"]
+TEXT_COLUMNS = ["Farmer ID", "Name", "Email"]
+
+# Arrow-backed strings when pyarrow is installed
+STRING_DTYPE = pd.StringDtype("pyarrow") if importlib.util.find_spec("pyarrow") else pd.StringDtype()
+
+# Hints for pd.read_csv so text columns are parsed straight into their final dtypes
+READ_DTYPES = {
+    **{column: STRING_DTYPE for column in TEXT_COLUMNS},
+    **{column: "category" for column in ["Crop Type", *CATEGORY_OPTIONS]},
+}
+
+
+class SchemaError(ValueError):
+    """A row about to be written does not fit the farmer schema."""
+
+
+def normalize_crop(crop):
+    """'  sugar   cane ' -> 'Sugar Cane'."""
+    return " ".join(str(crop).split()).title()
+
+
+def _fixed_categories(values, options):
+    # Values outside the options (hand-edited files) are kept as extra categories
+    values = values.astype("category")
+    extras = sorted(category for category in values.cat.categories if category not in options)
+    return values.cat.set_categories(options + extras)
+
+
+def _crop_categories(values):
+    # Normalize the (few) distinct names, then remap codes, instead of every row
+    values = values.astype("category")
+    normalized = [normalize_crop(category) for category in values.cat.categories]
+    categories = sorted(set(normalized))
+    code_map = np.array([categories.index(name) for name in normalized] + [-1], dtype=np.int64)
+    return pd.Series(
+        pd.Categorical.from_codes(code_map[values.cat.codes.to_numpy()], categories=categories),
+        index=values.index,
+    )
+
+
+def apply_schema(farmers_df):
+    """Cast a loaded farmer table to the declared in-memory dtypes."""
+    columns = {}
+    for column in TEXT_COLUMNS:
+        if column in farmers_df.columns:
+            columns[column] = farmers_df[column].astype(STRING_DTYPE)
+    if "Age" in farmers_df.columns:
+        age = pd.to_numeric(farmers_df["Age"], errors="coerce").round()
+        age = age.where(age.between(0, 127))
+        columns["Age"] = age.astype(np.int8) if age.notna().all() else age.astype("Int8")
+    if "Farm Size" in farmers_df.columns:
+        columns["Farm Size"] = pd.to_numeric(farmers_df["Farm Size"], errors="coerce").astype(np.float32)
+    if "Crop Type" in farmers_df.columns:
+        columns["Crop Type"] = _crop_categories(farmers_df["Crop Type"])
+    for column, options in CATEGORY_OPTIONS.items():
+        if column in farmers_df.columns:
+            columns[column] = _fixed_categories(farmers_df[column], options)
+    return farmers_df.assign(**columns)
+
+
+def check_fields(farmers_df):
+    """Vectorized field checks on raw (text) rows.
+
+    Returns (normalized_df, problems) where ``normalized_df`` has trimmed text,
+    canonical category spellings, normalized crop names and numeric Age and
+    Farm Size, and ``problems`` is a list of (row mask, column, message).
+    """
+    farmers_df = (
+        farmers_df[FIELDS]
+        .fillna("")
+        .astype(str)
+        .apply(lambda column: column.str.strip())
+        .reset_index(drop=True)
+    )
+    problems = []
+
+    for column in REQUIRED_TEXT_COLUMNS:
+        problems.append((farmers_df[column] == "", column, "is required"))
+
+    age = pd.to_numeric(farmers_df["Age"], errors="coerce")
+    problems.append((
+        age.isna() | (age % 1 != 0) | (age < MIN_AGE) | (age > MAX_AGE),
+        "Age", f"must be a whole number between {MIN_AGE} and {MAX_AGE}",
+    ))
+
+    farm_size = pd.to_numeric(farmers_df["Farm Size"], errors="coerce")
+    problems.append((farm_size.isna() | (farm_size <= 0), "Farm Size", "must be a number greater than 0"))
+
+    for column, options in CATEGORY_OPTIONS.items():
+        canonical = farmers_df[column].str.lower().map({option.lower(): option for option in options})
+        problems.append((canonical.isna(), column, f"must be one of: {', '.join(options)}"))
+        farmers_df[column] = canonical
+
+    farmers_df["Crop Type"] = farmers_df["Crop Type"].str.split().str.join(" ").str.title()
+    farmers_df["Age"] = age
+    farmers_df["Farm Size"] = farm_size
+    return farmers_df, problems
+
+
+def conform_frame(farmers_df):
+    """Normalized copy of rows about to be written; raises SchemaError if any row is invalid."""
+    normalized_df, problems = check_fields(farmers_df)
+    for mask, column, message in problems:
+        if mask.any():
+            raise SchemaError(f"{column} {message} ({int(mask.sum())} row(s))")
+    normalized_df["Age"] = normalized_df["Age"].astype(int)
+    normalized_df.index = farmers_df.index
+    extra_columns = [column for column in farmers_df.columns if column not in FIELDS]
+    return pd.concat([farmers_df[extra_columns], normalized_df], axis=1)
+
+
+def conform_record(record):
+    """Normalized copy of one registration dict; raises SchemaError if it is invalid.
+
+    Same rules and messages as ``conform_frame()``, checked on plain Python
+    values so a single registration does not pay for building a DataFrame.
+    """
+    values = {}
+    for column in FIELDS:
+        value = record.get(column)
+        missing = value is None or (isinstance(value, float) and math.isnan(value))
+        values[column] = "" if missing else str(value).strip()
+
+    def invalid(column, message):
+        return SchemaError(f"{column} {message} (1 row(s))")
+
+    for column in REQUIRED_TEXT_COLUMNS:
+        if values[column] == "":
+            raise invalid(column, "is required")
+
+    age = _to_number(values["Age"])
+    if math.isnan(age) or age % 1 != 0 or not MIN_AGE <= age <= MAX_AGE:
+        raise invalid("Age", f"must be a whole number between {MIN_AGE} and {MAX_AGE}")
+    farm_size = _to_number(values["Farm Size"])
+    if math.isnan(farm_size) or farm_size <= 0:
+        raise invalid("Farm Size", "must be a number greater than 0")
+
+    for column, options in CATEGORY_OPTIONS.items():
+        canonical = _CANONICAL_OPTIONS[column].get(values[column].lower())
+        if canonical is None:
+            raise invalid(column, f"must be one of: {', '.join(options)}")
+        values[column] = canonical
+
+    values["Crop Type"] = normalize_crop(values["Crop Type"])
+    values["Age"] = int(age)
+    values["Farm Size"] = farm_size
+    return {**{key: value for key, value in record.items() if key not in FIELDS}, **values}
+
+
+_CANONICAL_OPTIONS = {column: {option.lower(): option for option in options} for column, options in CATEGORY_OPTIONS.items()}
+
+
+def _to_number(text):
+    try:
+        return float(text)
+    except ValueError:
+        return math.nan
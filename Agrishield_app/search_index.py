@@ -0,0 +1,214 @@
+"""Trigram index for the dashboard's Name/Email substring search.
+
+Every row's lowercased Name and Email are split into 3-byte grams of their
+UTF-8 text (a substring of the text is a substring of its bytes), and each
+gram maps to the row positions containing it. Postings are NumPy arrays in
+CSR form: sorted gram codes, and offsets into one int32 array of rows.
+They are built in vectorized passes over the columns, BUILD_CHUNK_ROWS rows
+at a time. A query intersects the postings of its own trigrams, starting
+from the rarest, then confirms the survivors against the table's own
+columns. Queries shorter than three bytes have no trigrams and fall back to
+a vectorized scan.
+
+The index keeps no copy of the text, only a 64-bit hash of each row's Name
+and Email. When the table changes, rows whose hash is still in it keep their
+postings (renumbered to their new positions) and only new or edited rows are
+indexed, so appended registrations and re-registrations (the earlier row
+dropped, the new one appended) cost about their own size, not a rebuild.
+
+``search_rows()`` keeps a few indexes per process, one per table searched
+(the whole registry, or one province's partition).
+"""
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+GRAM = 3
+BUILD_CHUNK_ROWS = 100_000  # rows per vectorized build pass, bounding its temporary arrays
+MAX_SEGMENTS = 8  # the smallest posting segments are merged beyond this
+SAMPLE_ROWS = 64  # rows hashed to tell which shared index a table belongs to
+SHARED_INDEXES = 16  # tables indexed at once: the whole registry plus each province's partition
+
+_NO_ROWS = np.empty(0, dtype=np.int32)
+
+
+def _lowered(values):
+    return values.fillna("").astype(str).str.lower()
+
+
+def _gram_codes(data):
+    """Code of each trigram in ``data`` (UTF-8 bytes of texts separated by NUL) and the text it is in."""
+    data = np.frombuffer(data, dtype=np.uint8)
+    starts = np.flatnonzero((data[:-2] != 0) & (data[1:-1] != 0) & (data[2:] != 0))
+    codes = (data[starts].astype(np.int32) << 16) | (data[starts + 1].astype(np.int32) << 8) | data[starts + 2]
+    texts = np.cumsum(data == 0, dtype=np.int32)[starts]
+    return codes, texts
+
+
+def _query_codes(query):
+    codes, _ = _gram_codes(query.encode("utf-8"))
+    return set(codes.tolist())
+
+
+def _hashes(farmers_df):
+    return pd.util.hash_pandas_object(farmers_df[["Name", "Email"]], index=False, categorize=False).to_numpy()
+
+
+def row_keys(farmers_df):
+    """A 64-bit hash of each row's Name and Email, made unique by salting repeats with their position."""
+    keys = _hashes(farmers_df)
+    repeated = pd.Index(keys).duplicated()
+    if repeated.any():
+        keys = keys.copy()
+        keys[repeated] ^= pd.util.hash_array(np.flatnonzero(repeated))
+    return keys
+
+
+class _Segment:
+    """Postings of some rows: the rows containing ``grams[i]`` are ``postings[offsets[i]:offsets[i + 1]]``."""
+
+    def __init__(self, grams, offsets, postings):
+        self.grams = grams
+        self.offsets = offsets
+        self.postings = postings
+
+    @classmethod
+    def build(cls, farmers_df, positions):
+        """Postings of the rows at ``positions`` in ``farmers_df``."""
+        rows = farmers_df.iloc[positions]
+        texts = pd.concat([_lowered(rows["Name"]), _lowered(rows["Email"])], ignore_index=True)
+        codes, text_numbers = _gram_codes((texts.str.replace("\0", "", regex=False).str.cat(sep="\0") + "\0").encode())
+        row_of_text = np.concatenate([positions, positions]).astype(np.int64)
+        pairs = np.sort((codes.astype(np.int64) << 32) | row_of_text[text_numbers])
+        return cls._from_pairs(pairs[np.diff(pairs, prepend=-1) != 0])  # a sort beats np.unique here
+
+    @classmethod
+    def _from_pairs(cls, pairs):
+        """Segment from sorted, unique (gram code << 32 | row) pairs."""
+        codes = (pairs >> 32).astype(np.int32)
+        starts = np.flatnonzero(np.diff(codes, prepend=-1))
+        return cls(codes[starts], np.append(starts, len(codes)), (pairs & 0xFFFFFFFF).astype(np.int32))
+
+    def _pairs(self):
+        codes = np.repeat(self.grams.astype(np.int64), np.diff(self.offsets))
+        return (codes << 32) | self.postings
+
+    def merged(self, other):
+        return _Segment._from_pairs(np.sort(np.concatenate([self._pairs(), other._pairs()])))
+
+    def renumbered(self, new_positions):
+        """This segment with row ``p`` moved to ``new_positions[p]``; rows moved to -1 are dropped."""
+        postings = new_positions[self.postings]
+        kept = postings >= 0
+        kept_before = np.concatenate([[0], np.cumsum(kept)])
+        return _Segment(self.grams, kept_before[self.offsets], postings[kept])
+
+    def posting(self, code):
+        i = np.searchsorted(self.grams, code)
+        if i == len(self.grams) or self.grams[i] != code:
+            return _NO_ROWS
+        return self.postings[self.offsets[i]:self.offsets[i + 1]]
+
+    def candidates(self, codes):
+        """Rows containing every gram in ``codes`` (unsorted)."""
+        postings = sorted((self.posting(code) for code in codes), key=len)
+        rows = postings[0]
+        for posting in postings[1:]:
+            if not len(rows):
+                break
+            rows = rows[np.isin(rows, posting, assume_unique=True)]
+        return rows
+
+
+class TrigramIndex:
+    def __init__(self):
+        self._keys = pd.Index(np.empty(0, dtype=np.uint64))  # row_keys() of the table indexed, by position
+        self._segments = []
+        self._indexed = lambda: None  # weak reference to that table
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._keys)
+
+    def overlap(self, farmers_df, sample_keys):
+        """Rough share of ``farmers_df`` (sampled as ``sample_keys``) and of this index that are the same rows."""
+        if self._indexed() is farmers_df:
+            return 1.0
+        if not len(self) or not len(sample_keys):
+            return 0.0
+        found = (self._keys.get_indexer(sample_keys) >= 0).mean()
+        return found * min(len(self), len(farmers_df)) / max(len(self), len(farmers_df))
+
+    def update(self, farmers_df):
+        """Bring the index up to date with ``farmers_df``, indexing only rows it has not seen."""
+        with self._lock:
+            self._update(farmers_df)
+
+    def _update(self, farmers_df):
+        if self._indexed() is farmers_df:
+            return
+        keys = row_keys(farmers_df)
+        old_positions = self._keys.get_indexer(keys)  # each row's position in the indexed table, or -1
+        found = old_positions >= 0
+        size = len(self)
+        if not (len(keys) >= size and (old_positions[:size] == np.arange(size)).all()):
+            # Rows were dropped or moved (a re-registration replaces the earlier row)
+            new_positions = np.full(size, -1, dtype=np.int32)
+            new_positions[old_positions[found]] = np.flatnonzero(found)
+            self._segments = [segment.renumbered(new_positions) for segment in self._segments]
+        fresh = np.flatnonzero(~found).astype(np.int32)
+        for start in range(0, len(fresh), BUILD_CHUNK_ROWS):
+            self._segments.append(_Segment.build(farmers_df, fresh[start:start + BUILD_CHUNK_ROWS]))
+        while len(self._segments) > MAX_SEGMENTS:
+            self._segments.sort(key=lambda segment: len(segment.postings), reverse=True)
+            smallest = self._segments.pop()
+            self._segments[-1] = self._segments[-1].merged(smallest)
+        self._keys = pd.Index(keys)
+        self._indexed = weakref.ref(farmers_df)
+
+    def search(self, farmers_df, query):
+        """Sorted positions in ``farmers_df`` whose Name or Email contains ``query`` (case-insensitive)."""
+        query = query.lower()
+        codes = _query_codes(query)
+        with self._lock:
+            self._update(farmers_df)
+            if not len(codes):
+                return _confirmed(farmers_df, query, np.arange(len(farmers_df), dtype=np.int32))
+            rows = np.sort(np.concatenate([_NO_ROWS] + [segment.candidates(codes) for segment in self._segments]))
+        if len(query.encode("utf-8")) == GRAM:
+            return rows  # the query is its own trigram
+        return _confirmed(farmers_df, query, rows)
+
+
+def _confirmed(farmers_df, query, rows):
+    """The ``rows`` whose Name or Email really contains ``query``."""
+    names, emails = (_lowered(farmers_df[column].iloc[rows]) for column in ["Name", "Email"])
+    matches = names.str.contains(query, regex=False) | emails.str.contains(query, regex=False)
+    return rows[matches.to_numpy(dtype=bool)]
+
+
+_lock = threading.Lock()
+_shared = []  # most recently used first
+
+
+def shared_index(farmers_df):
+    """The process-wide index that ``farmers_df`` is (or is mostly) the table of, or a new one."""
+    sample = np.unique(np.linspace(0, len(farmers_df) - 1, SAMPLE_ROWS).astype(np.int64)) if len(farmers_df) else []
+    sample_keys = _hashes(farmers_df.iloc[sample])
+    with _lock:
+        scored = [(index.overlap(farmers_df, sample_keys), index) for index in _shared]
+        overlap, index = max(scored, key=lambda pair: pair[0], default=(0.0, None))
+        if overlap < 0.5:
+            index = TrigramIndex()
+        else:
+            _shared.remove(index)
+        _shared.insert(0, index)
+        del _shared[SHARED_INDEXES:]
+        return index
+
+
+def search_rows(farmers_df, query):
+    """Sorted positions in ``farmers_df`` of the rows whose Name or Email contains ``query`` (any case)."""
+    return shared_index(farmers_df).search(farmers_df, query)
@@ -0,0 +1,185 @@
+"""Monte Carlo simulation of the portfolio's seasonal climate losses.
+
+The book is reduced once to one cell per (Province, Climate Issue): the
+number of policies, the total climate-adjusted payout at stake (from
+``pricing.price_frame()``), its sum of squares and the premium collected.
+Every trial then draws, per cell, whether that climate event hits the
+province this season and, if it does, the share of the cell's farmers who
+claim. Trial cost therefore depends on the number of cells (at most a few
+dozen), not the number of policies, so 100k trials over a million-policy
+book take seconds.
+
+Events are correlated through a one-factor-per-group Gaussian copula: a
+season-wide factor, one factor per climate issue (a strong monsoon floods
+several provinces) and one per province (a bad year hits several perils).
+Within a hit cell, the claimed share follows a Beta distribution; the
+spread between farmers of different farm sizes is added with a normal
+approximation from the cell's sum of squared payouts.
+
+Trials run in batches of ``BATCH_TRIALS`` with independent seeds spawned
+from one SeedSequence, so results are identical whether the batches run
+in-process or across a process pool (``workers``).
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from pricing import price_frame
+
+# Probability that a climate event hits a province in one season
+EVENT_RATES = {
+    "Drought": 0.10,
+    "Flooding": 0.12,
+    "Extreme Heat": 0.15,
+    "Pest Infestation": 0.10,
+    "Other": 0.05,
+}
+PROVINCE_EVENT_RATES = {
+    ("Sindh", "Flooding"): 0.25,
+    ("Punjab", "Flooding"): 0.15,
+    ("Punjab", "Extreme Heat"): 0.20,
+    ("Khyber Pakhtunkhwa", "Flooding"): 0.18,
+    ("Balochistan", "Drought"): 0.30,
+    ("Sindh", "Drought"): 0.15,
+    ("Gilgit-Baltistan", "Other"): 0.15,  # glacial lake outbursts, landslides
+}
+DEFAULT_EVENT_RATE = 0.05
+
+# Shares of each cell's latent variance explained by the common factors;
+# the rest is specific to the cell
+SEASON_CORRELATION = 0.10
+ISSUE_CORRELATION = 0.30
+PROVINCE_CORRELATION = 0.20
+
+# Share of a hit cell's farmers who claim: Beta(a, b), mean a / (a + b)
+SEVERITY_A = 2.0
+SEVERITY_B = 4.0
+
+BATCH_TRIALS = 10_000
+CONFIDENCE_LEVELS = (0.95, 0.99, 0.995)
+
+
+def event_rate(province, climate_issue):
+    return PROVINCE_EVENT_RATES.get((province, climate_issue), EVENT_RATES.get(climate_issue, DEFAULT_EVENT_RATE))
+
+
+def portfolio_exposure(farmers_df):
+    """One row per (Province, Climate Issue) with Policies, Exposure, Exposure Sq, Premium and Event Rate."""
+    pricing_df = price_frame(farmers_df)
+    book = pd.DataFrame({
+        "Province": farmers_df["Province"],
+        "Climate Issue": farmers_df["Climate Issue"],
+        "Payout": pricing_df["Payout"],
+        "Payout Sq": pricing_df["Payout"] ** 2,
+        "Premium": pricing_df["Premium"],
+    })
+    exposure_df = (
+        book.groupby(["Province", "Climate Issue"], observed=True)
+        .agg(**{
+            "Policies": ("Payout", "size"),
+            "Exposure": ("Payout", "sum"),
+            "Exposure Sq": ("Payout Sq", "sum"),
+            "Premium": ("Premium", "sum"),
+        })
+        .reset_index()
+    )
+    exposure_df["Province"] = exposure_df["Province"].astype(str)
+    exposure_df["Climate Issue"] = exposure_df["Climate Issue"].astype(str)
+    exposure_df["Event Rate"] = [
+        event_rate(province, issue) for province, issue in zip(exposure_df["Province"], exposure_df["Climate Issue"])
+    ]
+    return exposure_df
+
+
+def _loss_model(exposure_df):
+    """Plain arrays describing the cells, cheap to send to worker processes."""
+    issue_codes, _ = pd.factorize(exposure_df["Climate Issue"])
+    province_codes, _ = pd.factorize(exposure_df["Province"])
+    rates = exposure_df["Event Rate"].to_numpy(dtype=np.float64).clip(1e-9, 1 - 1e-9)
+    return {
+        "thresholds": np.array([NormalDist().inv_cdf(rate) for rate in rates]),
+        "issue_codes": issue_codes,
+        "province_codes": province_codes,
+        "exposure": exposure_df["Exposure"].to_numpy(dtype=np.float64),
+        "exposure_sq": exposure_df["Exposure Sq"].to_numpy(dtype=np.float64),
+    }
+
+
+def _simulate_batch(model, trials, seed):
+    """Total portfolio loss for each of ``trials`` seasons."""
+    rng = np.random.default_rng(seed)
+    cells = model["thresholds"].size
+    if not cells:
+        return np.zeros(trials)
+
+    idiosyncratic = 1.0 - SEASON_CORRELATION - ISSUE_CORRELATION - PROVINCE_CORRELATION
+    latent = (
+        math.sqrt(SEASON_CORRELATION) * rng.standard_normal((trials, 1))
+        + math.sqrt(ISSUE_CORRELATION) * rng.standard_normal((trials, model["issue_codes"].max() + 1))[:, model["issue_codes"]]
+        + math.sqrt(PROVINCE_CORRELATION)
+        * rng.standard_normal((trials, model["province_codes"].max() + 1))[:, model["province_codes"]]
+        + math.sqrt(idiosyncratic) * rng.standard_normal((trials, cells))
+    )
+    hit = latent < model["thresholds"]
+
+    share = rng.beta(SEVERITY_A, SEVERITY_B, size=(trials, cells))
+    spread = np.sqrt(share * (1.0 - share) * model["exposure_sq"])
+    losses = np.clip(share * model["exposure"] + spread * rng.standard_normal((trials, cells)), 0.0, model["exposure"])
+    return np.where(hit, losses, 0.0).sum(axis=1)
+
+
+def _run_batch(job):
+    return _simulate_batch(*job)
+
+
+def simulate_losses(exposure_df, trials, seed=0, workers=1, batch_trials=BATCH_TRIALS):
+    """Portfolio loss for each of ``trials`` simulated seasons (a NumPy array).
+
+    ``workers`` > 1 spreads the batches over a process pool; ``None`` uses
+    every CPU. The result does not depend on ``workers``.
+    """
+    model = _loss_model(exposure_df)
+    sizes = [min(batch_trials, trials - start) for start in range(0, trials, batch_trials)]
+    jobs = list(zip([model] * len(sizes), sizes, np.random.SeedSequence(seed).spawn(len(sizes))))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) == 1:
+        batches = [_run_batch(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            batches = list(pool.map(_run_batch, jobs))
+    return np.concatenate(batches) if batches else np.zeros(0)
+
+
+def risk_summary(losses, premium, levels=CONFIDENCE_LEVELS):
+    """Loss distribution statistics: expected loss, VaR/TVaR per level and loss ratios vs premium."""
+    losses = np.sort(np.asarray(losses, dtype=np.float64))
+    expected_loss = losses.mean() if losses.size else 0.0
+    summary = {
+        "Trials": int(losses.size),
+        "Premium": float(premium),
+        "Expected Loss": float(expected_loss),
+        "Std Dev": float(losses.std()) if losses.size else 0.0,
+        "Max Loss": float(losses[-1]) if losses.size else 0.0,
+        "Expected Loss Ratio": float(expected_loss / premium) if premium else math.nan,
+        "Probability Loss > Premium": float((losses > premium).mean()) if losses.size else 0.0,
+    }
+    for level in levels:
+        label = f"{level * 100:g}%"
+        value_at_risk = float(np.quantile(losses, level)) if losses.size else 0.0
+        tail = losses[losses >= value_at_risk]
+        summary[f"VaR {label}"] = value_at_risk
+        summary[f"TVaR {label}"] = float(tail.mean()) if tail.size else value_at_risk
+        summary[f"TVaR {label} Loss Ratio"] = summary[f"TVaR {label}"] / premium if premium else math.nan
+    return summary
+
+
+def simulate_portfolio(farmers_df, trials=10_000, seed=0, workers=1):
+    """Run the whole simulation on a farmer table. Returns (summary, losses, exposure_df)."""
+    exposure_df = portfolio_exposure(farmers_df)
+    losses = simulate_losses(exposure_df, trials, seed=seed, workers=workers)
+    return risk_summary(losses, exposure_df["Premium"].sum()), losses, exposure_df
@@ -0,0 +1,83 @@
+"""Memory-mapped Arrow snapshot of a registry CSV, for fast cold starts.
+
+Next to ``farmers_data.csv`` a CsvStore keeps ``farmers_data.csv.arrow``:
+the parsed, schema-typed table as an uncompressed Arrow IPC file, tagged
+with the position in the CSV it covers (the same (inode, size, last bytes)
+check the store uses for incremental reloads). A new process maps the file
+instead of parsing the CSV, then parses only the lines appended after that
+position. The mapped text columns stay backed by the OS page cache, so
+several app processes on one machine share a single copy of them instead of
+each holding its own.
+
+Snapshots are written atomically (temporary file + ``os.replace()``), so a
+process still mapping the old one keeps reading a consistent file. A
+snapshot that no longer matches the CSV (after a compaction or a hand edit)
+is ignored, and the next full read writes a new one. Without pyarrow there
+are no snapshots and the CSV is always parsed.
+"""
+import os
+
+SNAPSHOT_FORMAT = b"1"
+_KEYS = (b"agrishield.csv_inode", b"agrishield.csv_size", b"agrishield.csv_tail")
+
+
+def snapshot_path(csv_path):
+    return csv_path + ".arrow"
+
+
+def write_snapshot(path, farmers_df, position):
+    """Atomically write ``farmers_df`` as the snapshot covering CSV ``position``. Returns False without pyarrow."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+    inode, size, tail = position
+    table = pa.Table.from_pandas(farmers_df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **table.schema.metadata,
+        b"agrishield.format": SNAPSHOT_FORMAT,
+        _KEYS[0]: str(inode).encode(),
+        _KEYS[1]: str(size).encode(),
+        _KEYS[2]: tail.hex().encode(),
+    })
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+    return True
+
+
+def _open(path):
+    """(Arrow file reader, CSV position) for a valid snapshot, else None."""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    try:
+        reader = pa.ipc.open_file(pa.memory_map(path))
+    except (OSError, pa.ArrowInvalid):
+        return None
+    metadata = reader.schema.metadata or {}
+    if metadata.get(b"agrishield.format") != SNAPSHOT_FORMAT:
+        return None
+    inode, size, tail = (metadata[key] for key in _KEYS)
+    return reader, (int(inode), int(size), bytes.fromhex(tail.decode()))
+
+
+def snapshot_position(path):
+    """The CSV position a snapshot covers (read from its footer only), or None."""
+    opened = _open(path)
+    return opened[1] if opened is not None else None
+
+
+def read_snapshot(path):
+    """(farmers_df, CSV position) from a snapshot, or None if there is no usable one.
+
+    Columns are zero-copy views of the memory-mapped file where Arrow and
+    pandas allow it (the text columns); treat the frame as read-only.
+    """
+    opened = _open(path)
+    if opened is None:
+        return None
+    reader, position = opened
+    return reader.read_all().to_pandas(split_blocks=True), position
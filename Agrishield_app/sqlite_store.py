@@ -0,0 +1,274 @@
+"""SQLite backend for the farmer registry (AGRISHIELD_STORAGE=sqlite).
+
+The database runs in WAL mode so several Streamlit worker processes can read
+while one writes; writers take ``BEGIN IMMEDIATE`` and wait on busy_timeout
+instead of failing. Province, Insurance and Climate Issue are indexed for the
+dashboard filters and per-province summaries. Email is unique and, with
+name + province, indexed case-insensitively, so duplicate checks are index
+lookups.
+
+A ``meta.version`` counter, bumped by triggers on every change, gives pages
+a one-row version check to decide whether their cached table is stale.
+Triggers also keep ``farmer_cube``, the aggregate cube of farmer counts and
+farm size per Province x Insurance x Climate Issue (see cube.py), in the
+same transaction as each write.
+"""
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+from cube import CUBE_DIMENSIONS, AggregateCube
+from data_store import BaseStore, CsvStore, DuplicateEmailError, new_farmer_id, with_farmer_ids
+from identity_index import email_key
+from schema import COLUMNS, apply_schema, conform_frame, conform_record
+
+SQL_COLUMNS = {
+    "Farmer ID": "farmer_id",
+    "Name": "name",
+    "Email": "email",
+    "Age": "age",
+    "Farm Size": "farm_size",
+    "Crop Type": "crop_type",
+    "Insurance": "insurance",
+    "Climate Issue": "climate_issue",
+    "Province": "province",
+}
+SELECT_COLUMNS = ", ".join(f'{sql} AS "{column}"' for column, sql in SQL_COLUMNS.items())
+INSERT_SQL = (
+    f"INSERT INTO farmers ({', '.join(SQL_COLUMNS.values())}) "
+    f"VALUES ({', '.join('?' for _ in SQL_COLUMNS)})"
+)
+UPDATE_SQL = (
+    f"UPDATE farmers SET {', '.join(f'{sql} = ?' for column, sql in SQL_COLUMNS.items() if column != 'Farmer ID')} "
+    "WHERE farmer_id = ?"
+)
+LOOKUP_CHUNK = 500  # bound parameters per IN (...) query
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS farmers (
+    id INTEGER PRIMARY KEY,
+    farmer_id TEXT,
+    name TEXT NOT NULL,
+    email TEXT NOT NULL COLLATE NOCASE,
+    age INTEGER,
+    farm_size REAL,
+    crop_type TEXT,
+    insurance TEXT,
+    climate_issue TEXT,
+    province TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_farmers_email ON farmers (email);
+CREATE INDEX IF NOT EXISTS idx_farmers_province ON farmers (province);
+CREATE INDEX IF NOT EXISTS idx_farmers_insurance ON farmers (insurance);
+CREATE INDEX IF NOT EXISTS idx_farmers_climate_issue ON farmers (climate_issue);
+CREATE INDEX IF NOT EXISTS idx_farmers_identity ON farmers (name COLLATE NOCASE, province);
+
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+
+CREATE TRIGGER IF NOT EXISTS farmers_version_insert AFTER INSERT ON farmers
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'version'; END;
+CREATE TRIGGER IF NOT EXISTS farmers_version_update AFTER UPDATE ON farmers
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'version'; END;
+CREATE TRIGGER IF NOT EXISTS farmers_version_delete AFTER DELETE ON farmers
+BEGIN UPDATE meta SET value = value + 1 WHERE key = 'version'; END;
+"""
+
+# Databases created before Farmer IDs existed get the column and backfilled IDs
+FARMER_ID_UPGRADE = """
+ALTER TABLE farmers ADD COLUMN farmer_id TEXT;
+UPDATE farmers SET farmer_id = lower(hex(randomblob(8))) WHERE farmer_id IS NULL;
+"""
+FARMER_ID_INDEX = "CREATE UNIQUE INDEX IF NOT EXISTS idx_farmers_farmer_id ON farmers (farmer_id);"
+
+# Missing dimension values are stored as '' so every row has a cell to upsert into
+CUBE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS farmer_cube (
+    province TEXT NOT NULL,
+    insurance TEXT NOT NULL,
+    climate_issue TEXT NOT NULL,
+    farmers INTEGER NOT NULL,
+    farm_size REAL NOT NULL,
+    PRIMARY KEY (province, insurance, climate_issue)
+);
+
+CREATE TRIGGER IF NOT EXISTS farmers_cube_insert AFTER INSERT ON farmers
+BEGIN
+    INSERT INTO farmer_cube VALUES (
+        IFNULL(NEW.province, ''), IFNULL(NEW.insurance, ''), IFNULL(NEW.climate_issue, ''), 1, IFNULL(NEW.farm_size, 0)
+    ) ON CONFLICT DO UPDATE SET farmers = farmers + 1, farm_size = farm_size + excluded.farm_size;
+END;
+CREATE TRIGGER IF NOT EXISTS farmers_cube_delete AFTER DELETE ON farmers
+BEGIN
+    UPDATE farmer_cube SET farmers = farmers - 1, farm_size = farm_size - IFNULL(OLD.farm_size, 0)
+    WHERE province = IFNULL(OLD.province, '') AND insurance = IFNULL(OLD.insurance, '')
+      AND climate_issue = IFNULL(OLD.climate_issue, '');
+END;
+CREATE TRIGGER IF NOT EXISTS farmers_cube_update AFTER UPDATE OF province, insurance, climate_issue, farm_size ON farmers
+BEGIN
+    UPDATE farmer_cube SET farmers = farmers - 1, farm_size = farm_size - IFNULL(OLD.farm_size, 0)
+    WHERE province = IFNULL(OLD.province, '') AND insurance = IFNULL(OLD.insurance, '')
+      AND climate_issue = IFNULL(OLD.climate_issue, '');
+    INSERT INTO farmer_cube VALUES (
+        IFNULL(NEW.province, ''), IFNULL(NEW.insurance, ''), IFNULL(NEW.climate_issue, ''), 1, IFNULL(NEW.farm_size, 0)
+    ) ON CONFLICT DO UPDATE SET farmers = farmers + 1, farm_size = farm_size + excluded.farm_size;
+END;
+"""
+# Fills the cube of a database created before it existed
+CUBE_STALE = "SELECT (SELECT COUNT(*) FROM farmers) != (SELECT TOTAL(farmers) FROM farmer_cube)"
+CUBE_REBUILD = """
+INSERT INTO farmer_cube
+SELECT IFNULL(province, ''), IFNULL(insurance, ''), IFNULL(climate_issue, ''), COUNT(*), TOTAL(farm_size)
+FROM farmers GROUP BY 1, 2, 3
+"""
+CUBE_SELECT = """
+SELECT NULLIF(province, '') AS "Province", NULLIF(insurance, '') AS "Insurance",
+       NULLIF(climate_issue, '') AS "Climate Issue", farmers AS "Farmers", farm_size AS "Farm Size"
+FROM farmer_cube WHERE farmers > 0
+"""
+
+
+class SqliteStore(BaseStore):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        if "farmer_id" not in [row[1] for row in conn.execute("PRAGMA table_info(farmers)")]:
+            conn.executescript(FARMER_ID_UPGRADE)
+        conn.executescript(FARMER_ID_INDEX)
+        conn.executescript(CUBE_SCHEMA)
+        if conn.execute(CUBE_STALE).fetchone()[0]:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM farmer_cube")
+                conn.execute(CUBE_REBUILD)
+
+    def _connect(self):
+        """One connection per thread; Streamlit runs each session in its own thread."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def version(self):
+        return self._connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def _read_all(self):
+        return apply_schema(pd.read_sql_query(f"SELECT {SELECT_COLUMNS} FROM farmers ORDER BY id", self._connect()))
+
+    def append(self, record):
+        record = conform_record({**record, "Farmer ID": record.get("Farmer ID") or new_farmer_id()})
+        try:
+            with self._transaction() as conn:
+                conn.execute(INSERT_SQL, [record[column] for column in COLUMNS])
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateEmailError(f"{record['Email']} is already registered", self.find_email(record["Email"])) from exc
+        return record["Farmer ID"]
+
+    def append_many(self, farmers_df):
+        """Insert rows in one transaction, skipping duplicate emails. Returns rows inserted."""
+        rows = conform_frame(with_farmer_ids(farmers_df))[COLUMNS].itertuples(index=False, name=None)
+        with self._transaction() as conn:
+            cursor = conn.executemany(INSERT_SQL.replace("INSERT", "INSERT OR IGNORE", 1), rows)
+            return cursor.rowcount
+
+    def update(self, farmer_id, record):
+        """Replace the registration ``farmer_id`` with ``record`` in place. Returns the Farmer ID."""
+        record = conform_record({**record, "Farmer ID": farmer_id})
+        try:
+            with self._transaction() as conn:
+                cursor = conn.execute(UPDATE_SQL, [record[column] for column in COLUMNS[1:]] + [farmer_id])
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateEmailError(f"{record['Email']} is already registered", self.find_email(record["Email"])) from exc
+        if cursor.rowcount == 0:
+            raise KeyError(farmer_id)
+        return farmer_id
+
+    def has_farmers(self):
+        return self._connect().execute("SELECT EXISTS (SELECT 1 FROM farmers)").fetchone()[0] == 1
+
+    def find_email(self, email):
+        row = self._connect().execute("SELECT farmer_id FROM farmers WHERE email = ?", [email.strip()]).fetchone()
+        return None if row is None else row[0]
+
+    def find_identity(self, name, province):
+        sql = "SELECT farmer_id FROM farmers WHERE name = ? COLLATE NOCASE AND province = ? ORDER BY id DESC LIMIT 1"
+        row = self._connect().execute(sql, [" ".join(name.split()), province.strip()]).fetchone()
+        return None if row is None else row[0]
+
+    def taken_emails(self, emails):
+        keys = list({email_key(email) for email in emails})
+        conn = self._connect()
+        taken = set()
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            rows = conn.execute(f"SELECT email FROM farmers WHERE email IN ({', '.join('?' for _ in chunk)})", chunk)
+            taken.update(email_key(email) for (email,) in rows)
+        return taken
+
+    def query(self, province=None, insurance=None):
+        if province is None and insurance is None:
+            return self.load()
+        where, params = _where(province, insurance)
+        sql = f"SELECT {SELECT_COLUMNS} FROM farmers WHERE {where} ORDER BY id"
+        return apply_schema(pd.read_sql_query(sql, self._connect(), params=params))
+
+    def _read_cube(self):
+        return AggregateCube(pd.read_sql_query(CUBE_SELECT, self._connect()))
+
+    def options(self, column):
+        if column in CUBE_DIMENSIONS:
+            return super().options(column)
+        sql_column = SQL_COLUMNS[column]
+        rows = self._connect().execute(
+            f"SELECT DISTINCT {sql_column} FROM farmers WHERE {sql_column} IS NOT NULL ORDER BY {sql_column}"
+        )
+        return [value for (value,) in rows]
+
+    def get(self, farmer_id):
+        farmer_df = pd.read_sql_query(
+            f"SELECT {SELECT_COLUMNS} FROM farmers WHERE farmer_id = ?", self._connect(), params=[farmer_id]
+        )
+        return None if farmer_df.empty else farmer_df.iloc[0]
+
+
+def _where(province=None, insurance=None):
+    """(WHERE clause, parameters) for the Province / Insurance filters; needs at least one."""
+    clauses, params = [], []
+    if province is not None:
+        clauses.append("province = ?")
+        params.append(province)
+    if insurance is not None:
+        clauses.append("insurance = ?")
+        params.append(insurance)
+    return " AND ".join(clauses), params
+
+
+def migrate_csv(csv_path, db_path):
+    """One-shot CSV -> SQLite copy of the current registrations. Returns (rows_read, rows_inserted).
+
+    Reads through CsvStore so a re-registration's latest row replaces the
+    earlier ones, as the app sees it, instead of losing to them on the
+    unique Farmer ID and email indexes.
+    """
+    farmers_df = CsvStore(csv_path).load()
+    store = SqliteStore(db_path)
+    return len(farmers_df), store.append_many(farmers_df)
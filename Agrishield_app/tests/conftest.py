@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The app's modules import each other flat, as Streamlit runs them from Agrishield_app/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from schema import FIELDS  # noqa: E402
+
+
+@pytest.fixture
+def farmer():
+    """Factory for valid registration dicts; tests set only the fields they care about."""
+    def make(name, email, province="Punjab", insurance="Basic Coverage", farm_size=12.0):
+        return dict(zip(FIELDS, [name, email, 40, farm_size, "Wheat", insurance, "Drought", province]))
+    return make
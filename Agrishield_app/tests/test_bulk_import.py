@@ -0,0 +1,42 @@
+import io
+
+import pandas as pd
+import pytest
+
+from bulk_import import ImportFileError, read_table, validate
+
+
+def test_validate_reports_each_failed_check_by_spreadsheet_row():
+    raw_df = pd.DataFrame({
+        "name": ["Ali Khan", "", "Sara Baig", "Omar Shah", "Ali Again"],
+        "EMAIL": ["ali@example.com", "nobody@example.com", "not-an-email", "omar@example.com", "ALI@example.com"],
+        "Age": ["40", "17", "35.5", "52", "40"],
+        "Farm Size": ["12", "3", "0", "4", "1"],
+        "Crop Type": [" sugar   cane", "Wheat", "Rice", "Cotton", "Wheat"],
+        "Insurance": ["flood protection", "Basic Coverage", "Basic Coverage", "Hail Cover", "Basic Coverage"],
+        "Climate Issue": ["Flooding", "Drought", "Drought", "Drought", "Drought"],
+        "Province": ["Punjab", "Sindh", "Sindh", "Sindh", "Punjab"],
+    })
+    valid_df, errors_df = validate(raw_df, existing_emails={"omar@example.com"})
+
+    assert valid_df.to_dict("records") == [{
+        "Name": "Ali Khan", "Email": "ali@example.com", "Age": 40, "Farm Size": 12.0, "Crop Type": "Sugar Cane",
+        "Insurance": "Flood Protection", "Climate Issue": "Flooding", "Province": "Punjab",
+    }]
+    assert errors_df[["Row", "Column"]].values.tolist() == [
+        [3, "Name"], [3, "Age"],
+        [4, "Age"], [4, "Farm Size"], [4, "Email"],
+        [5, "Insurance"], [5, "Email"],
+        [6, "Email"],
+    ]
+    assert errors_df["Error"].tolist()[-2:] == ["Email is already registered", "Email duplicates an earlier row in this file"]
+
+
+def test_validate_rejects_a_table_missing_columns():
+    with pytest.raises(ImportFileError, match="Province"):
+        validate(pd.DataFrame({"Name": ["Ali Khan"]}), existing_emails=set())
+
+
+def test_read_table_rejects_old_excel_files():
+    with pytest.raises(ImportFileError, match=r"\.xlsx or \.csv"):
+        read_table(io.BytesIO(b""), "cooperative.XLS")
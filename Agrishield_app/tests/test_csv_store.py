@@ -0,0 +1,81 @@
+import os
+
+import pandas as pd
+import pytest
+
+import config
+from data_store import CsvStore
+from snapshot import snapshot_position
+
+
+def test_appended_rows_match_the_file_and_reach_other_readers(tmp_path, farmer):
+    path = str(tmp_path / "farmers.csv")
+    store = CsvStore(path)
+    farmer_id = store.append(farmer("Ali Khan", "ali@example.pk"))
+    written = store.append_many(pd.DataFrame([
+        farmer("Sara Baig", "sara@example.pk"),
+        farmer("Ali Again", "ALI@example.pk"),  # email already registered: skipped
+    ]))
+
+    assert written == 1
+    with open(path, "rb") as handle:
+        data = handle.read()
+    assert b"\r" not in data and data.count(b"\n") == 3
+
+    reader = CsvStore(path)
+    assert reader.load()["Name"].tolist() == ["Ali Khan", "Sara Baig"]
+    assert reader.get(farmer_id)["Email"] == "ali@example.pk"
+
+
+def test_compact_keeps_each_farmers_latest_row(tmp_path, farmer):
+    path = str(tmp_path / "farmers.csv")
+    store = CsvStore(path)
+    farmer_id = store.append(farmer("Ali Khan", "ali@example.pk"))
+    store.append(farmer("Sara Baig", "sara@example.pk"))
+    store.update(farmer_id, farmer("Ali Khan", "ali@example.pk", farm_size=30.0))
+    with open(path, "rb") as handle:
+        sara_line = handle.read().splitlines()[2]
+    with open(path, "ab") as handle:
+        handle.write(sara_line + b"\n")  # an exact duplicate row
+
+    assert store.compact() == (4, 2)
+    farmers_df = CsvStore(path).load()
+    assert farmers_df["Name"].tolist() == ["Sara Baig", "Ali Khan"]
+    assert farmers_df["Farm Size"].tolist() == [12.0, 30.0]
+
+
+def test_reload_parses_only_the_lines_appended_since(tmp_path, farmer, monkeypatch):
+    path = str(tmp_path / "farmers.csv")
+    writer = CsvStore(path)
+    farmer_id = writer.append(farmer("Ali Khan", "ali@example.pk"))
+    reader = CsvStore(path)
+    assert reader.load()["Name"].tolist() == ["Ali Khan"]
+
+    writer.append(farmer("Sara Baig", "sara@example.pk"))
+    writer.update(farmer_id, farmer("Ali Khan", "ali@example.pk", farm_size=30.0))
+    with open(path, "ab") as handle:
+        handle.write(b"F-half,Omar Sh")  # a line another process is still writing
+    monkeypatch.setattr(reader, "_read_all", lambda: pytest.fail("the whole file was read again"))
+
+    farmers_df = reader.load()
+    assert farmers_df["Name"].tolist() == ["Sara Baig", "Ali Khan"]  # the re-registration replaced Ali's row
+    assert farmers_df["Farm Size"].tolist() == [12.0, 30.0]
+    assert reader.get(farmer_id)["Farm Size"] == 30.0
+
+
+def test_snapshot_from_before_a_compaction_is_not_used(tmp_path, farmer, monkeypatch):
+    monkeypatch.setattr(config, "SNAPSHOTS", True)
+    path = str(tmp_path / "farmers.csv")
+    store = CsvStore(path)
+    farmer_id = store.append(farmer("Ali Khan", "ali@example.pk"))
+    store.append(farmer("Sara Baig", "sara@example.pk"))
+    assert len(CsvStore(path).load()) == 2  # a full parse, which writes the snapshot
+    assert snapshot_position(path + ".arrow") is not None
+
+    store.update(farmer_id, farmer("Ali Khan", "ali@example.pk", farm_size=30.0))
+    store.compact()  # a new file, which the snapshot no longer describes
+
+    farmers_df = CsvStore(path).load()
+    assert farmers_df["Name"].tolist() == ["Sara Baig", "Ali Khan"]
+    assert farmers_df["Farm Size"].tolist() == [12.0, 30.0]
+    assert snapshot_position(path + ".arrow")[:2] == (os.stat(path).st_ino, os.path.getsize(path))  # rewritten
@@ -0,0 +1,34 @@
+import pandas as pd
+import pytest
+
+from cube import CUBE_DIMENSIONS, AggregateCube
+from schema import apply_schema
+
+
+def _cells(cube):
+    return cube.cells.sort_values(CUBE_DIMENSIONS, ignore_index=True)
+
+
+def test_plus_and_combine_match_a_cube_built_from_the_rows(farmer):
+    rows = [
+        farmer("Ali Khan", "ali@example.pk", "Punjab", "Flood Protection", 12.5),
+        farmer("Sara Baig", "sara@example.pk", "Sindh", "Basic Coverage", 3.0),
+        farmer("Omar Shah", "omar@example.pk", "Sindh", "Basic Coverage", 4.0),
+        farmer("Zara Ali", "zara@example.pk", "Balochistan", "Drought Protection", 7.25),
+    ]
+    farmers_df = apply_schema(pd.DataFrame(rows))
+    cube = AggregateCube.from_frame(farmers_df.iloc[:2])
+
+    # Add two farmers, then Sara re-registers with a bigger farm and Zara's only cell empties out
+    grown = cube.plus(farmers_df.iloc[2:])
+    resized = apply_schema(pd.DataFrame([{**rows[1], "Farm Size": 5.0}]))
+    updated = grown.plus(resized, farmers_df.iloc[[1]]).plus(farmers_df.iloc[:0], farmers_df.iloc[[3]])
+
+    pd.testing.assert_frame_equal(_cells(grown), _cells(AggregateCube.from_frame(farmers_df)))
+    expected = AggregateCube.from_frame(pd.concat([farmers_df.iloc[[0, 2]], resized], ignore_index=True))
+    pd.testing.assert_frame_equal(_cells(updated), _cells(expected))
+    assert updated.values("Province") == ["Punjab", "Sindh"]
+    assert updated.totals(province="Sindh") == pytest.approx(expected.totals(province="Sindh"))
+
+    by_province = [AggregateCube.from_frame(province_df) for _, province_df in farmers_df.groupby("Province", observed=True)]
+    pd.testing.assert_frame_equal(_cells(AggregateCube.combine(by_province)), _cells(AggregateCube.from_frame(farmers_df)))
@@ -0,0 +1,29 @@
+import pytest
+
+import data_store
+from partitioned_store import PartitionedStore
+from sqlite_store import SqliteStore
+
+
+@pytest.fixture(params=["partitioned", "sqlite"])
+def store(request, tmp_path, farmer):
+    if request.param == "sqlite":
+        store = SqliteStore(str(tmp_path / "farmers.db"))
+    else:
+        store = PartitionedStore(str(tmp_path / "farmers_by_province"))
+    store.append(farmer("Ali Khan", "ali@example.pk", "Punjab", "Flood Protection"))
+    store.append(farmer("Sara Khan", "sara@example.pk", "Sindh", "Flood Protection"))
+    store.append(farmer("Omar Shah", "omar@example.pk", "Sindh"))
+    data_store.set_store(store)
+    yield store
+    data_store.set_store(None)
+
+
+def test_filtered_view_matches_filters_and_search(store):
+    _, rows = data_store.filtered_view(province="Sindh", insurance="Flood Protection")
+    assert rows["Name"].tolist() == ["Sara Khan"]
+    _, rows = data_store.filtered_view(search="khan")
+    assert rows["Name"].tolist() == ["Ali Khan", "Sara Khan"]
+    _, rows = data_store.filtered_view(province="Sindh", search="KHAN")
+    assert rows["Name"].tolist() == ["Sara Khan"]
+
@@ -0,0 +1,16 @@
+import os
+
+import config
+import metrics
+
+
+def test_each_process_writes_its_own_labelled_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "METRICS_FILE", str(tmp_path / "metrics.prom"))
+    metrics.set_page("dashboard")
+    with metrics.span("pricing", rows=3):
+        pass
+    metrics.write_metrics_file()
+
+    written = (tmp_path / f"metrics.{os.getpid()}.prom").read_text(encoding="utf-8")
+    assert f'agrishield_stage_rows_total{{pid="{os.getpid()}",page="dashboard",stage="pricing"}}' in written
+    assert not metrics._exporter_started  # only the app's pages start the exporter
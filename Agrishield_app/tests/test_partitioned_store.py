@@ -0,0 +1,53 @@
+import threading
+
+import data_store
+from partitioned_store import PartitionedStore
+
+
+def test_province_view_reads_only_its_partition(tmp_path, farmer):
+    writer = PartitionedStore(str(tmp_path))
+    writer.append(farmer("Ali Khan", "ali@example.pk", "Punjab"))
+    writer.append(farmer("Sara Baig", "sara@example.pk", "Sindh"))
+
+    store = PartitionedStore(str(tmp_path))
+    data_store.set_store(store)
+    try:
+        assert store.has_farmers()
+        assert store.options("Province") == ["Punjab", "Sindh"]
+        key, rows = data_store.filtered_view(province="Sindh")
+        assert rows["Name"].tolist() == ["Sara Baig"]
+        assert store.partition("Punjab")._cached == (None, None)  # never loaded
+
+        # A write in another province leaves the Sindh view's version, and so its cache entry, alone
+        writer.append(farmer("Omar Shah", "omar@example.pk", "Punjab"))
+        assert data_store.data_version("Sindh") == key[0]
+        assert data_store.filtered_view(province="Sindh")[0] == key
+    finally:
+        data_store.set_store(None)
+
+
+def test_empty_registry_has_no_farmers(tmp_path):
+    assert not PartitionedStore(str(tmp_path)).has_farmers()
+
+
+def test_moves_between_provinces_in_both_directions_at_once(tmp_path, farmer):
+    store = PartitionedStore(str(tmp_path))
+    ali = store.append(farmer("Ali Khan", "ali@example.pk", "Punjab"))
+    sara = store.append(farmer("Sara Baig", "sara@example.pk", "Sindh"))
+
+    def move_back_and_forth(farmer_id, name, email, provinces):
+        for province in provinces * 5:
+            store.update(farmer_id, farmer(name, email, province))
+
+    threads = [
+        threading.Thread(target=move_back_and_forth, args=(ali, "Ali Khan", "ali@example.pk", ["Sindh", "Punjab"])),
+        threading.Thread(target=move_back_and_forth, args=(sara, "Sara Baig", "sara@example.pk", ["Punjab", "Sindh"])),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    assert not any(thread.is_alive() for thread in threads)  # opposite moves did not deadlock
+
+    assert PartitionedStore(str(tmp_path)).partition("Punjab").load()["Name"].tolist() == ["Ali Khan"]
+    assert PartitionedStore(str(tmp_path)).partition("Sindh").load()["Name"].tolist() == ["Sara Baig"]
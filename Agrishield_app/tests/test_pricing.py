@@ -0,0 +1,20 @@
+import pandas as pd
+import pytest
+
+from pricing import price_frame, quote
+
+
+def test_price_frame_matches_single_quotes_and_falls_back_for_unknown_values():
+    farmers_df = pd.DataFrame({
+        "Insurance": ["Flood Protection", "Basic Coverage", "Hail Cover", None],
+        "Climate Issue": ["Flooding", "Locusts", "Drought", "Other"],
+        "Farm Size": [10.0, 2.5, 4.0, 1.0],
+    }, index=[7, 3, 9, 1])
+    priced = price_frame(farmers_df.astype({"Insurance": "category"}))
+
+    assert priced.index.tolist() == [7, 3, 9, 1]
+    for label, row in farmers_df.iterrows():
+        assert priced.loc[label].to_dict() == pytest.approx(quote(row["Insurance"], row["Climate Issue"], row["Farm Size"]))
+    # Unknown insurance prices as Basic Coverage; an unknown climate issue has no multiplier
+    assert priced.loc[9, "Premium"] == 1000 * 4.0
+    assert priced.loc[3, "Payout"] == priced.loc[3, "Base Payout"] == 5000 * 2.5
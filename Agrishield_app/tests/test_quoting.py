@@ -0,0 +1,42 @@
+import io
+
+import pandas as pd
+import pytest
+
+from pricing import quote
+from quoting import QuoteInputError, quote_file, quote_frame
+
+
+def test_quote_frame_prices_valid_rows_and_explains_the_rest():
+    profiles_df = pd.DataFrame({
+        "applicant": ["A1", "A2", "A3", "A4"],
+        "INSURANCE": [" flood protection", "Hail Cover", "Basic Coverage", "Basic Coverage"],
+        "Climate Issue": ["Flooding", "Drought", "Locusts", "Drought"],
+        "Farm Size": ["10", "2", "3", "-1"],
+    })
+    quotes_df = quote_frame(profiles_df)
+
+    assert quotes_df["applicant"].tolist() == ["A1", "A2", "A3", "A4"]
+    assert quotes_df.loc[0, "Insurance"] == "Flood Protection"
+    assert quotes_df.loc[0, ["Premium", "Base Payout", "Payout"]].to_dict() == pytest.approx(quote("Flood Protection", "Flooding", 10.0))
+    assert quotes_df["Error"].tolist() == [
+        "",
+        "Insurance must be one of: Basic Coverage, Comprehensive Coverage, Drought Protection, Flood Protection",
+        "Climate Issue must be one of: Drought, Flooding, Extreme Heat, Pest Infestation, Other",
+        "Farm Size must be a number greater than 0",
+    ]
+    assert quotes_df.loc[1:, ["Premium", "Base Payout", "Payout"]].isna().all().all()
+    assert quotes_df.loc[1, "Insurance"] == "Hail Cover"  # rejected values are passed through as sent
+
+
+def test_quote_frame_requires_the_pricing_columns():
+    with pytest.raises(QuoteInputError, match="Farm Size"):
+        quote_frame(pd.DataFrame({"Insurance": ["Basic Coverage"], "Climate Issue": ["Drought"]}))
+
+
+def test_quote_file_counts_errors_across_chunks():
+    source = io.StringIO("Insurance,Climate Issue,Farm Size\n" + "Basic Coverage,Drought,1\nBasic Coverage,Drought,x\n" * 3)
+    out = io.StringIO()
+
+    assert quote_file(source, out, chunk_rows=4) == (6, 3)
+    assert out.getvalue().count("Premium") == 1  # one header, however many chunks
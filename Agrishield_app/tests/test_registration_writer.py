@@ -0,0 +1,41 @@
+import pytest
+
+from registration_writer import RegistrationWriter
+
+
+class FlakyStore:
+    """Fails the first ``failures`` batches, then stores them."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.rows = []
+
+    def find_email(self, email):
+        return None
+
+    def append_many(self, farmers_df):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.rows.extend(farmers_df["Farmer ID"])
+        return len(farmers_df)
+
+
+def test_failed_batch_is_reported_not_dropped(farmer):
+    writer = RegistrationWriter(FlakyStore(failures=3), flush_seconds=0, retries=2, retry_seconds=0)
+    farmer_id, future = writer.submit(farmer("Ali Khan", "ali@example.pk"))
+    with pytest.raises(OSError):
+        future.result(timeout=5)
+    assert writer.pending(farmer_id) is None
+    assert isinstance(writer.failure(farmer_id), OSError)
+    writer.close()
+
+
+def test_failed_batch_is_retried(farmer):
+    store = FlakyStore(failures=2)
+    writer = RegistrationWriter(store, flush_seconds=0, retries=2, retry_seconds=0)
+    farmer_id, future = writer.submit(farmer("Ali Khan", "ali@example.pk"))
+    assert future.result(timeout=5) == farmer_id
+    assert store.rows == [farmer_id]
+    assert writer.failure(farmer_id) is None
+    writer.close()
@@ -0,0 +1,31 @@
+import math
+
+import pandas as pd
+import pytest
+
+from schema import SchemaError, conform_frame, conform_record
+
+
+@pytest.mark.parametrize("field, value, message", [
+    ("Name", "   ", "Name is required"),
+    ("Age", "17", "Age must be a whole number between 18 and 100"),
+    ("Age", 40.5, "Age must be a whole number"),
+    ("Farm Size", "0", "Farm Size must be a number greater than 0"),
+    ("Farm Size", math.nan, "Farm Size must be a number"),
+    ("Insurance", "Hail Cover", "Insurance must be one of: Basic Coverage,"),
+    ("Province", None, "Province must be one of:"),
+])
+def test_conform_rejects_invalid_fields(farmer, field, value, message):
+    record = {**farmer("Ali Khan", "ali@example.com"), field: value}
+    with pytest.raises(SchemaError, match=message):
+        conform_record(record)
+    with pytest.raises(SchemaError, match=message):
+        conform_frame(pd.DataFrame([record]))
+
+
+def test_conform_normalizes_and_keeps_extra_columns(farmer):
+    record = {**farmer(" Ali Khan ", "ali@example.com", insurance="flood PROTECTION"), "Crop Type": "sugar   cane", "Farmer ID": "F1"}
+    expected = {**farmer("Ali Khan", "ali@example.com", insurance="Flood Protection"), "Crop Type": "Sugar Cane", "Farmer ID": "F1"}
+
+    assert conform_record(record) == expected
+    assert conform_frame(pd.DataFrame([record], index=[5])).loc[5].to_dict() == expected
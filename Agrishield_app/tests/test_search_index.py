@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+import search_index
+from search_index import TrigramIndex
+
+
+def registry(names):
+    return pd.DataFrame({
+        "Name": names,
+        "Email": [f"{name.split()[0].lower()}{i}@example.pk" for i, name in enumerate(names)],
+    })
+
+
+def test_search_is_case_insensitive_and_confirms_matches():
+    farmers_df = registry(["Ali Khan", "Sara Baig", "Khalid Shah", "Zainab Khanum"])
+    index = TrigramIndex()
+    assert index.search(farmers_df, "KHAN").tolist() == [0, 3]
+    assert index.search(farmers_df, "kh").tolist() == [0, 2, 3]  # too short for a trigram: scanned
+    assert index.search(farmers_df, "sara1@").tolist() == [1]
+    assert index.search(farmers_df, "han sh").tolist() == []
+
+
+def test_reregistration_renumbers_rows_instead_of_rebuilding(monkeypatch):
+    farmers_df = registry(["Ali Khan", "Sara Baig", "Khalid Shah"])
+    index = TrigramIndex()
+    index.update(farmers_df)
+
+    built = []
+    build = search_index._Segment.build.__func__
+    monkeypatch.setattr(search_index._Segment, "build", classmethod(
+        lambda cls, frame, positions: built.append(positions.tolist()) or build(cls, frame, positions)
+    ))
+    # Sara re-registers under a new name: her earlier row is dropped and the new one appended
+    updated_df = pd.concat([farmers_df.drop(index=1), registry(["Sara Qureshi"]).assign(Email="sara1@example.pk")],
+                           ignore_index=True)
+    assert index.search(updated_df, "qureshi").tolist() == [2]
+    assert index.search(updated_df, "shah").tolist() == [1]
+    assert index.search(updated_df, "baig").tolist() == []
+    assert built == [[2]]
+
+
+def test_search_rows_keeps_an_index_per_table():
+    whole_df = registry([f"Farmer {i} Khan" for i in range(40)])
+    part_df = whole_df.iloc[:10].reset_index(drop=True)
+    for farmers_df in (whole_df, part_df, whole_df):
+        expected = np.arange(len(farmers_df))
+        assert search_index.search_rows(farmers_df, "khan").tolist() == expected.tolist()
+    assert search_index.shared_index(part_df) is not search_index.shared_index(whole_df)
@@ -0,0 +1,14 @@
+from data_store import CsvStore
+from sqlite_store import SqliteStore, migrate_csv
+
+
+def test_migrate_csv_keeps_latest_registration(tmp_path, farmer):
+    csv_path, db_path = str(tmp_path / "farmers.csv"), str(tmp_path / "farmers.db")
+    csv_store = CsvStore(csv_path)
+    farmer_id = csv_store.append(farmer("Ali Khan", "ali@example.pk"))
+    csv_store.append(farmer("Sara Baig", "sara@example.pk"))
+    csv_store.update(farmer_id, farmer("Ali Khan", "ali@example.pk", farm_size=99.0))
+
+    assert migrate_csv(csv_path, db_path) == (2, 2)
+    migrated = SqliteStore(db_path).get(farmer_id)
+    assert migrated["Farm Size"] == 99.0
@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STREAMLIT_MODULES = {"app", "ui"}  # everything else is also used by manage.py and the benchmarks
+
+
+def test_helper_modules_do_not_import_streamlit():
+    modules = sorted(
+        name[:-3] for name in os.listdir(APP_DIR)
+        if name.endswith(".py") and name[:-3] not in STREAMLIT_MODULES
+    )
+    # A fresh interpreter, so modules imported by other tests cannot hide an import
+    code = f"import sys\nimport {', '.join(modules)}\nassert 'streamlit' not in sys.modules"
+    result = subprocess.run([sys.executable, "-c", code], cwd=APP_DIR, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,49 @@
+"""Streamlit pieces shared by the pages.
+
+Unlike views.py and the other helper modules this one imports Streamlit, so
+only pages import it.
+
+Charts on pages 2-4 sit in lazy tabs inside an ``st.fragment``: only the
+open tab's chart is built, switching tabs reruns just that fragment, and
+Plotly (through charts.py) is first imported when a chart is drawn.
+"""
+import streamlit as st
+
+import config
+from data_store import data_version, get_farmer, registration_error
+from metrics import set_page
+
+
+@st.fragment(run_every=config.LIVE_REFRESH_SECONDS or None)
+def live_refresh(page, seen_version, province=None):
+    """Rerun the page once the data version differs from ``seen_version``, the one it was drawn from.
+
+    Runs every config.LIVE_REFRESH_SECONDS. The check is a file stat or one
+    SQLite row, so open pages follow new registrations without re-reading
+    the registry until something has changed. A page drawn from one
+    ``province``'s data (see ``data_version()``) passes it, so it only
+    follows that province.
+    """
+    set_page(page)
+    if data_version(province) != seen_version:
+        st.rerun()
+
+
+def registered_farmer():
+    """This session's farmer record; stops the page with a message if there is none.
+
+    The session keeps only its farmer ID. A registration whose background
+    write failed for good is reported here, on the farmer's next page,
+    instead of the farmer silently disappearing.
+    """
+    farmer_id = st.session_state.get("farmer_id")
+    farmer = get_farmer(farmer_id)
+    if farmer is not None:
+        return farmer
+    error = registration_error(farmer_id)
+    if error is not None:
+        st.session_state.farmer_id = None
+        st.error(f"⚠️ Your registration could not be saved ({error}). Kindly register again.")
+    else:
+        st.warning("⚠️ Kindly register first in order to get further details.")
+    st.stop()
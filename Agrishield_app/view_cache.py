@@ -0,0 +1,122 @@
+"""Process-wide LRU cache of dashboard views, shared by every session.
+
+Officers often ask for the same view at the same moment (during a flood,
+hundreds of them open "Punjab / Flood Protection"). The dashboard keys each
+view by (data version, province, insurance, search text) and caches:
+
+- the view's rows, as their positions in the shared farmer table, and
+- each chart drawn for it, as the serialized Plotly figure JSON.
+
+Keys carry the data version, so a write never serves stale rows or charts;
+entries for old versions simply stop being asked for and age out. The
+cache is bounded by the bytes it holds (``config.VIEW_CACHE_MB``), evicting
+the least recently used entries first, and counts hits, misses and
+evictions for the Ops Metrics page. When many sessions miss on the same key
+at once, one builds the entry while the others wait for it.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import config
+
+
+def _sizeof(value):
+    """Approximate bytes held by a cached value."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, str):
+        return sys.getsizeof(value)
+    return 64  # None and other small values
+
+
+class ViewCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, bytes), least recently used first
+        self._building = {}  # key -> threading.Event set once the entry is built
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_build(self, key, build):
+        """The value cached under ``key``, or ``build()``'s result, cached if it fits."""
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                building = self._building.get(key)
+                if building is None:
+                    building = self._building[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another session is building this entry; use it once it is there
+            building.wait()
+
+        try:
+            value = build()
+            self._put(key, value)
+            return value
+        finally:
+            with self._lock:
+                del self._building[key]
+            building.set()
+
+    def _put(self, key, value):
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "Entries": len(self._entries),
+                "MB": self.bytes / 2**20,
+                "Max MB": self.max_bytes / 2**20,
+                "Hits": self.hits,
+                "Misses": self.misses,
+                "Evictions": self.evictions,
+                "Hit Rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_lock = threading.Lock()
+_shared = None
+
+
+def shared_cache():
+    """The process-wide view cache."""
+    global _shared
+    if _shared is None:
+        with _lock:
+            if _shared is None:
+                _shared = ViewCache(int(config.VIEW_CACHE_MB * 2**20))
+    return _shared
+
+
+def cached_figure(view_key, name, build):
+    """Plotly JSON of chart ``name`` for the view ``view_key``; ``build()`` returns the figure on a miss."""
+    return shared_cache().get_or_build((view_key, name), lambda: build().to_json())
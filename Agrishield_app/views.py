@@ -0,0 +1,80 @@
+"""Server-side helpers that shape dashboard data before it reaches the browser."""
+import math
+
+import numpy as np
+import pandas as pd
+
+
+def page_count(total_rows, page_size):
+    return max(1, math.ceil(total_rows / page_size))
+
+
+def paginate(frame, page, page_size, sort_by=None, ascending=True):
+    """Slice one page out of ``frame``. Returns (page_frame, page, total_pages).
+
+    Only ``sort_by`` is sorted (not the whole frame) and only the visible
+    window is materialized. ``page`` is 1-based and clamped into range.
+    """
+    total_pages = page_count(len(frame), page_size)
+    page = min(max(1, int(page)), total_pages)
+    start = (page - 1) * page_size
+
+    if sort_by is None:
+        return frame.iloc[start:start + page_size], page, total_pages
+
+    order = (
+        frame[sort_by]
+        .reset_index(drop=True)
+        .sort_values(ascending=ascending, kind="stable", na_position="last")
+        .index[start:start + page_size]
+    )
+    return frame.iloc[order], page, total_pages
+
+
+def category_counts(values, label):
+    """Counts per category as a two-column frame, ready for a pie/bar chart."""
+    counts = values.value_counts().rename_axis(label).reset_index(name="Count")
+    return counts[counts["Count"] > 0]
+
+
+def histogram_bins(values, bins=20):
+    """NumPy histogram of ``values`` as a frame with bin edges, centres and counts."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    counts, edges = np.histogram(values, bins=bins)
+    return pd.DataFrame({
+        "Bin Start": edges[:-1],
+        "Bin End": edges[1:],
+        "Bin Centre": (edges[:-1] + edges[1:]) / 2,
+        "Count": counts,
+    })
+
+
+def box_stats(values, max_outliers=100, seed=0):
+    """Tukey box-plot summary of ``values`` with a capped sample of outliers.
+
+    Fences are the most extreme values within 1.5 x IQR of the quartiles, as
+    Plotly would draw them from raw data. Returns None for empty input.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not values.size:
+        return None
+
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]
+    if outliers.size > max_outliers:
+        outliers = np.random.default_rng(seed).choice(outliers, max_outliers, replace=False)
+
+    return {
+        "min": values.min(),
+        "q1": q1,
+        "median": median,
+        "q3": q3,
+        "max": values.max(),
+        "lowerfence": inside.min(),
+        "upperfence": inside.max(),
+        "outliers": outliers,
+    }